@@ -1,8 +1,12 @@
 from sqladmin import ModelView
 from sqladmin.authentication import AuthenticationBackend
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 
+from app.db import query
+from app.db.connection import SessionLocal
 from app.db.models import Event, Media, Team, User
+from app.utils.cache import roster_cache, user_cache
 from app.utils.config import get_settings
 
 
@@ -40,17 +44,109 @@ class UserAdmin(ModelView, model=User):
         User.expo_push_token,
     ]
 
+    async def on_model_change(self, data, model, is_created, request) -> None:
+        request.state.previous_team_id = None if is_created else model.team_id
+
+    # api_key or team may change here, so drop every cached snapshot; the feed
+    # shows user names, so the listings of the user's teams change too
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        user_cache.clear()
+        roster_cache.clear()
+
+        team_ids = {model.team_id, request.state.previous_team_id} - {None}
+        for team_id in team_ids:
+            await run_in_threadpool(_bump_team_version, team_id)
+
+    async def on_model_delete(self, model, request) -> None:
+        request.state.previous_team_id = model.team_id
+
+    async def after_model_delete(self, model, request) -> None:
+        user_cache.clear()
+        roster_cache.clear()
+        await run_in_threadpool(_bump_team_version, request.state.previous_team_id)
+
+
+def _event_team_id(event_id: int) -> int | None:
+    db = SessionLocal()
+    try:
+        return db.query(Event.team_id).filter(Event.id == event_id).scalar()
+    finally:
+        db.close()
+
+
+def _sync_media_team(event_id: int, previous_team_id: int | None = None) -> None:
+    db = SessionLocal()
+    try:
+        query.sync_media_team(db, event_id, previous_team_id)
+    finally:
+        db.close()
+
+
+def _bump_team_version(team_id: int) -> None:
+    db = SessionLocal()
+    try:
+        query.bump_team_version(db, team_id)
+    finally:
+        db.close()
+
+
+def _refresh_event_preview(event_id: int) -> None:
+    db = SessionLocal()
+    try:
+        query.refresh_event_preview(db, event_id)
+    finally:
+        db.close()
+
 
 class EventAdmin(ModelView, model=Event):
     column_list = [Event.id, Event.team_id, Event.title]
 
+    async def on_model_change(self, data, model, is_created, request) -> None:
+        request.state.previous_team_id = None if is_created else model.team_id
+
+    # Media.team_id is denormalized from the event, so it follows team changes;
+    # any other edit only changes the team's event list
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        previous_team_id = request.state.previous_team_id
+        if previous_team_id and previous_team_id != model.team_id:
+            await run_in_threadpool(_sync_media_team, model.id, previous_team_id)
+        else:
+            await run_in_threadpool(_bump_team_version, model.team_id)
+
+    async def on_model_delete(self, model, request) -> None:
+        request.state.previous_team_id = model.team_id
+
+    async def after_model_delete(self, model, request) -> None:
+        await run_in_threadpool(_bump_team_version, request.state.previous_team_id)
+
 
 class MediaAdmin(ModelView, model=Media):
     column_list = [
         Media.id,
         Media.event_id,
+        Media.team_id,
         Media.user_id,
         Media.url,
         Media.file_size,
         Media.created_at,
     ]
+
+    # The form has no team field; new media take their event's team, and
+    # edits moving media to another team's event are synced afterwards
+    async def on_model_change(self, data, model, is_created, request) -> None:
+        request.state.previous_event_id = None if is_created else model.event_id
+        if is_created:
+            model.team_id = await run_in_threadpool(_event_team_id, int(data["event"]))
+
+    # Media edited here bypasses create_media_bulk/delete_media; a media moved
+    # to another event changes the preview of both events
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        if not is_created:
+            await run_in_threadpool(_sync_media_team, model.event_id)
+
+        event_ids = {model.event_id, request.state.previous_event_id} - {None}
+        for event_id in event_ids:
+            await run_in_threadpool(_refresh_event_preview, event_id)
+
+    async def after_model_delete(self, model, request) -> None:
+        await run_in_threadpool(_refresh_event_preview, model.event_id)
@@ -1,15 +1,85 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event, make_url
 from sqlalchemy.orm import sessionmaker
 
 from app.utils.config import get_settings
 
 settings = get_settings()
 
+
+def configure_sqlite(engine: Engine, read_only: bool = False) -> None:
+    """
+    Apply the SQLite pragmas from settings on every new connection
+    WAL lets readers run alongside a writer, and busy_timeout makes
+    concurrent writers wait for the lock instead of failing immediately
+    Read-only engines leave the journal mode to the writer and reject writes
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout,
+        "cache_size": settings.sqlite_cache_size,
+        "mmap_size": settings.sqlite_mmap_size,
+        "temp_store": settings.sqlite_temp_store,
+    }
+    if read_only:
+        del pragmas["journal_mode"]
+        pragmas["query_only"] = "ON"
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(
+    url: str, read_only: bool = False, statement_timeout: int | None = None
+) -> Engine:
+    """
+    Create an engine configured for the URL's dialect
+    SQLite gets the connect pragmas; server databases get a pooled engine
+    and, on PostgreSQL, a per-statement timeout in milliseconds
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        configure_sqlite(engine, read_only=read_only)
+        return engine
+
+    if statement_timeout is None:
+        statement_timeout = settings.db_statement_timeout
+
+    connect_args = {}
+    if make_url(url).get_backend_name() == "postgresql":
+        options = [f"-c statement_timeout={statement_timeout}"]
+        if read_only:
+            options.append("-c default_transaction_read_only=on")
+        connect_args["options"] = " ".join(options)
+
+    return create_engine(
+        url,
+        connect_args=connect_args,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle,
+    )
+
+
 # Create engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False},  # For SQLite
-)
+engine = create_db_engine(settings.database_url)
+
+# Read-only engine for queries that can tolerate replica lag
+if settings.database_read_url:
+    read_engine = create_db_engine(settings.database_read_url, read_only=True)
+else:
+    read_engine = engine
 
-# Create session factory
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
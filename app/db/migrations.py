@@ -0,0 +1,297 @@
+"""
+Schema migrations for existing databases
+
+`Base.metadata.create_all` only creates missing tables, so changes to tables
+that already exist (new columns, indexes, backfills) are applied here.
+Every step is idempotent and safe to run on each deploy.
+"""
+
+import json
+from collections import Counter
+
+from sqlalchemy import (
+    JSON,
+    Connection,
+    Engine,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+    union_all,
+    update,
+)
+
+from app.db.models import Base, Event, EventTag, Media
+from app.db.query import PREVIEW_THUMBNAIL_COUNT
+from app.utils.s3 import get_key_from_url
+
+OBJECT_KEY_INDEXES = ("ix_media_s3_key", "ix_media_thumb_s3_key")
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def _add_media_team_id(conn: Connection) -> None:
+    if not _has_column(conn, "media", "team_id"):
+        conn.execute(
+            text("ALTER TABLE media ADD COLUMN team_id INTEGER REFERENCES teams(id)")
+        )
+
+    conn.execute(
+        text(
+            "UPDATE media SET team_id = "
+            "(SELECT events.team_id FROM events WHERE events.id = media.event_id) "
+            "WHERE team_id IS NULL"
+        )
+    )
+    # Superseded by ix_media_team_id_created_at_id
+    conn.execute(text("DROP INDEX IF EXISTS ix_media_created_at_id"))
+
+
+def _add_media_object_keys(conn: Connection) -> None:
+    for column in ("s3_key", "thumb_s3_key"):
+        if not _has_column(conn, "media", column):
+            conn.execute(text(f"ALTER TABLE media ADD COLUMN {column} VARCHAR(255)"))
+
+    # Older rows only kept the public URLs, which were built from the keys
+    rows = conn.execute(
+        select(Media.id, Media.url, Media.thumb_url, Media.thumb_s3_key).where(
+            Media.s3_key.is_(None)
+        )
+    ).all()
+    if not rows:
+        return
+
+    keys = {
+        media_id: (get_key_from_url(url), get_key_from_url(thumb_url), thumb_s3_key)
+        for media_id, url, thumb_url, thumb_s3_key in rows
+    }
+    counts = Counter(
+        key for s3_key, thumb_key, _ in keys.values() for key in (s3_key, thumb_key)
+    )
+    keyed = conn.execute(
+        select(Media.s3_key, Media.thumb_s3_key).where(
+            Media.s3_key.is_not(None),
+            Media.s3_key.in_(counts) | Media.thumb_s3_key.in_(counts),
+        )
+    )
+    counts.update(key for row in keyed for key in row if key in counts)
+
+    # Objects shared by several rows keep no key at all, so that deleting one
+    # of the rows never removes an object another one still shows
+    shared = [key for key, count in counts.items() if count > 1]
+    _clear_object_keys(conn, shared)
+    for media_id, (s3_key, thumb_key, current_thumb_key) in keys.items():
+        s3_key = None if s3_key in shared else s3_key
+        thumb_key = None if thumb_key in shared else thumb_key
+        if s3_key is None and thumb_key == current_thumb_key:
+            continue
+        conn.execute(
+            update(Media)
+            .where(Media.id == media_id)
+            .values(s3_key=s3_key, thumb_s3_key=thumb_key)
+        )
+
+
+def _clear_object_keys(conn: Connection, keys: list[str]) -> None:
+    if not keys:
+        return
+    conn.execute(update(Media).where(Media.s3_key.in_(keys)).values(s3_key=None))
+    conn.execute(
+        update(Media).where(Media.thumb_s3_key.in_(keys)).values(thumb_s3_key=None)
+    )
+
+
+def _add_event_preview(conn: Connection) -> None:
+    if not _has_column(conn, "events", "media_count"):
+        conn.execute(
+            text("ALTER TABLE events ADD COLUMN media_count INTEGER NOT NULL DEFAULT 0")
+        )
+    if not _has_column(conn, "events", "thumbnails"):
+        conn.execute(text("ALTER TABLE events ADD COLUMN thumbnails JSON"))
+
+    # Backfill events that have never had a preview computed
+    pending = select(Event.id).where(Event.thumbnails.is_(None))
+    ranked = (
+        select(
+            Media.event_id,
+            Media.thumb_url,
+            func.row_number()
+            .over(
+                partition_by=Media.event_id,
+                order_by=(Media.created_at.desc(), Media.id.desc()),
+            )
+            .label("rn"),
+            func.count().over(partition_by=Media.event_id).label("media_count"),
+        ).where(Media.event_id.in_(pending))
+    ).subquery()
+    rows = conn.execute(
+        select(ranked.c.event_id, ranked.c.thumb_url, ranked.c.media_count)
+        .where(ranked.c.rn <= PREVIEW_THUMBNAIL_COUNT)
+        .order_by(ranked.c.event_id, ranked.c.rn)
+    )
+
+    previews = {}
+    for event_id, thumb_url, media_count in rows:
+        previews.setdefault(event_id, (media_count, []))[1].append(thumb_url)
+
+    for event_id, (media_count, thumbnails) in previews.items():
+        conn.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            .values(media_count=media_count, thumbnails=thumbnails)
+        )
+    conn.execute(
+        update(Event)
+        .where(Event.thumbnails.is_(None))
+        .values(media_count=0, thumbnails=[])
+    )
+
+
+def _add_team_version(conn: Connection) -> None:
+    if not _has_column(conn, "teams", "version"):
+        conn.execute(
+            text("ALTER TABLE teams ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        )
+
+
+def _validate_file_metadata(conn: Connection) -> None:
+    # file_metadata used to be free-form text holding json.dumps() output; SQLite
+    # keeps JSON as text, so only rows that fail to parse need fixing. Rows
+    # holding a JSON 'null' are folded into SQL NULL as well
+    if conn.dialect.name == "sqlite":
+        conn.execute(
+            text(
+                "UPDATE media SET file_metadata = NULL "
+                "WHERE json_valid(file_metadata) = 0 OR file_metadata = 'null'"
+            )
+        )
+        return
+    if conn.dialect.name != "postgresql":
+        return
+
+    # PostgreSQL has a real JSON type, so convert the column itself
+    column = next(
+        c for c in inspect(conn).get_columns("media") if c["name"] == "file_metadata"
+    )
+    if not isinstance(column["type"], JSON):
+        _convert_file_metadata_to_json(conn)
+
+    conn.execute(
+        text(
+            "UPDATE media SET file_metadata = NULL "
+            "WHERE json_typeof(file_metadata) = 'null'"
+        )
+    )
+
+
+def _convert_file_metadata_to_json(conn: Connection) -> None:
+    rows = conn.execute(
+        text("SELECT id, file_metadata FROM media WHERE file_metadata IS NOT NULL")
+    )
+    invalid_ids = []
+    for media_id, file_metadata in rows:
+        try:
+            json.loads(file_metadata)
+        except ValueError:
+            invalid_ids.append(media_id)
+    if invalid_ids:
+        conn.execute(
+            update(Media).where(Media.id.in_(invalid_ids)).values(file_metadata=None)
+        )
+
+    conn.execute(
+        text(
+            "ALTER TABLE media ALTER COLUMN file_metadata TYPE JSON "
+            "USING file_metadata::json"
+        )
+    )
+
+
+def _move_tags_to_event_tags(conn: Connection) -> None:
+    # events.tags used to hold comma separated tags
+    if not _has_column(conn, "events", "tags"):
+        return
+
+    rows = conn.execute(
+        text("SELECT id, tags FROM events WHERE tags IS NOT NULL AND tags != ''")
+    ).all()
+    # The old column was unbounded; longer tags are cut to fit event_tags.tag
+    max_length = EventTag.tag.type.length
+    tag_rows = [
+        {"event_id": event_id, "tag": tag}
+        for event_id, tags in rows
+        for tag in dict.fromkeys(tag[:max_length] for tag in tags.split(","))
+        if tag
+    ]
+    if tag_rows:
+        conn.execute(insert(EventTag), tag_rows)
+
+    # The column is no longer mapped; clear it so this step stays idempotent
+    conn.execute(text("UPDATE events SET tags = NULL"))
+
+
+def _drop_superseded_indexes(conn: Connection) -> None:
+    # Replaced by ix_events_team_id_date_id for keyset pagination
+    conn.execute(text("DROP INDEX IF EXISTS ix_events_team_id_date"))
+    # Replaced by ix_media_event_id_created_at_id, which also covers the id
+    # tie-break of the thumbnail ordering
+    conn.execute(text("DROP INDEX IF EXISTS ix_media_event_id_created_at"))
+
+
+def _make_object_key_indexes_unique(conn: Connection) -> None:
+    # The object key indexes used to be plain; _create_missing_indexes
+    # recreates them as unique
+    indexes = {ix["name"]: ix["unique"] for ix in inspect(conn).get_indexes("media")}
+    if all(indexes.get(name) for name in OBJECT_KEY_INDEXES):
+        return
+
+    for name in OBJECT_KEY_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    # Rows sharing an object keep no key, as in _add_media_object_keys
+    keys = union_all(
+        select(Media.s3_key.label("key")),
+        select(Media.thumb_s3_key.label("key")),
+    ).subquery()
+    shared = (
+        conn.execute(
+            select(keys.c.key)
+            .where(keys.c.key.is_not(None))
+            .group_by(keys.c.key)
+            .having(func.count() > 1)
+        )
+        .scalars()
+        .all()
+    )
+    _clear_object_keys(conn, shared)
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+# Applied in order; index creation stays last so it can cover new columns
+MIGRATIONS = [
+    _add_media_team_id,
+    _add_media_object_keys,
+    _add_event_preview,
+    _add_team_version,
+    _validate_file_metadata,
+    _move_tags_to_event_tags,
+    _drop_superseded_indexes,
+    _make_object_key_indexes_unique,
+    _create_missing_indexes,
+]
+
+
+def run_migrations(engine: Engine) -> None:
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        for migration in MIGRATIONS:
+            migration(conn)
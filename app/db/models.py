@@ -3,7 +3,17 @@ SQLAlchemy models for the database
 """
 
 from nanoid import generate
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -16,6 +26,8 @@ class Team(Base):
     name = Column(String(200), nullable=False)
     storage_limit = Column(Integer, default=1048576)
     storage_used = Column(Integer, default=0)
+    # Bumped on every event/media write, used as the ETag of team listings
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
     users = relationship("User", back_populates="team")
     events = relationship("Event", back_populates="team")
@@ -50,31 +62,101 @@ class Event(Base):
     description = Column(Text, nullable=True)
     date = Column(DateTime, nullable=False)
     location = Column(String(255), nullable=True)
-    tags = Column(Text, nullable=True)  # sepreated by ","
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
 
+    # Preview maintained on media writes (see query.refresh_event_preview)
+    media_count = Column(Integer, nullable=False, default=0, server_default="0")
+    thumbnails = Column(JSON, nullable=False, default=list)  # latest thumb urls
+
     media = relationship("Media", back_populates="event")
     team = relationship("Team", back_populates="events")
+    tag_rows = relationship(
+        "EventTag",
+        back_populates="event",
+        cascade="all, delete-orphan",
+        order_by="EventTag.id",
+        lazy="selectin",
+    )
+
+    # list[str] view over tag_rows
+    tags = association_proxy("tag_rows", "tag", creator=lambda tag: EventTag(tag=tag))
+
+    __table_args__ = (
+        Index("ix_events_team_id_date_id", team_id, date.desc(), id.desc()),
+    )
 
     def __str__(self):
         return f"<Event id={self.id} title={self.title}>"
 
 
+class EventTag(Base):
+    __tablename__ = "event_tags"
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    tag = Column(String(100), nullable=False)
+
+    event = relationship("Event", back_populates="tag_rows")
+
+    __table_args__ = (
+        Index("ix_event_tags_event_id", event_id),
+        # Tag filter on event lists
+        Index("ix_event_tags_tag_event_id", tag, event_id),
+    )
+
+    def __str__(self):
+        return f"<EventTag event_id={self.event_id} tag={self.tag}>"
+
+
+class StorageReservation(Base):
+    """Quota held for a presigned upload until it is confirmed or expires"""
+
+    __tablename__ = "storage_reservations"
+
+    key = Column(String(255), primary_key=True)  # presigned original object key
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    size_kb = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_storage_reservations_team_id_expires_at", team_id, expires_at),
+    )
+
+    def __str__(self):
+        return f"<StorageReservation key={self.key}>"
+
+
 class Media(Base):
     __tablename__ = "media"
 
     id = Column(Integer, primary_key=True, index=True)
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)  # = event.team_id
     url = Column(Text, nullable=False)
     thumb_url = Column(Text, nullable=False)
+    s3_key = Column(String(255), nullable=True)  # object keys of url/thumb_url
+    thumb_s3_key = Column(String(255), nullable=True)
     file_type = Column(String(50), nullable=False)
     file_size = Column(Integer, nullable=True)
-    file_metadata = Column(Text, nullable=True)
+    file_metadata = Column(JSON(none_as_null=True), nullable=True)
     created_at = Column(DateTime, nullable=False)
 
     event = relationship("Event", back_populates="media")
     user = relationship("User", back_populates="media")
 
+    __table_args__ = (
+        # Per-event thumbnails and has_media
+        Index(
+            "ix_media_event_id_created_at_id", event_id, created_at.desc(), id.desc()
+        ),
+        # Team feed
+        Index("ix_media_team_id_created_at_id", team_id, created_at.desc(), id.desc()),
+        # Each S3 object belongs to at most one media; also answers whether an
+        # object is still referenced
+        Index("ix_media_s3_key", s3_key, unique=True),
+        Index("ix_media_thumb_s3_key", thumb_s3_key, unique=True),
+    )
+
     def __str__(self):
         return f"<Media id={self.id}>"
@@ -3,56 +3,93 @@ Database queries for events and media
 """
 
 import math
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
-from app.db.models import Event, Media, Team, User
+from app.db.models import Event, EventTag, Media, StorageReservation, Team, User
+from app.utils.cache import feed_cache, roster_cache, user_cache
+from app.utils.cursor import decode_cursor, encode_cursor
 
+# Number of thumbnails kept in Event.thumbnails
+PREVIEW_THUMBNAIL_COUNT = 3
 
-def list_events(db: Session, team_id: int) -> list[Event]:
-    events = (
+
+class StorageLimitExceededError(Exception):
+    """Raised when a write would take a team over its storage limit"""
+
+
+class MediaAlreadyExistsError(Exception):
+    """Raised when an S3 object already belongs to another media"""
+
+
+class MediaNotFoundError(Exception):
+    """Raised when media to delete is already gone"""
+
+
+@dataclass(frozen=True)
+class TeamMember:
+    """Roster entry, detached from the DB session so it can be cached"""
+
+    id: int
+    name: str
+    expo_push_token: str | None = None
+    profile_img: str | None = None
+
+
+def list_events(
+    db: Session,
+    team_id: int,
+    limit: int | None = None,
+    cursor: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    tag: str | None = None,
+) -> tuple[list[Event], str | None, bool]:
+    """
+    List team events, newest first, with optional keyset pagination on
+    (date, id), an inclusive date range and a tag filter
+    Returns: (events, next_cursor, has_more)
+    """
+    query_obj = (
         db.query(Event)
         .filter(Event.team_id == team_id)
-        .order_by(Event.date.desc())
-        .all()
+        .order_by(Event.date.desc(), Event.id.desc())
     )
 
-    # Preload thumbnails for all events (max 3 per event)
-    if events:
-        event_ids = [e.id for e in events]
-        # Get up to 3 media items per event, ordered by creation date
-
-        # Subquery to get row numbers for each event's media
-        subq = (
-            select(
-                Media.id,
-                Media.event_id,
-                Media.thumb_url,
-                func.row_number()
-                .over(partition_by=Media.event_id, order_by=Media.created_at.desc())
-                .label("rn"),
-            ).where(Media.event_id.in_(event_ids))
-        ).subquery()
-
-        # Get only the first 3 media items per event
-        thumbnails = (
-            db.query(subq.c.event_id, subq.c.thumb_url).filter(subq.c.rn <= 3).all()
+    if date_from is not None:
+        query_obj = query_obj.filter(Event.date >= date_from)
+    if date_to is not None:
+        query_obj = query_obj.filter(Event.date <= date_to)
+    if tag is not None:
+        query_obj = query_obj.filter(
+            Event.id.in_(select(EventTag.event_id).where(EventTag.tag == tag))
+        )
+
+    if cursor:
+        date, event_id = decode_cursor(cursor)
+        query_obj = query_obj.filter(
+            (Event.date < date) | ((Event.date == date) & (Event.id < event_id))
         )
 
-        # Group thumbnails by event_id
-        thumbnails_by_event = {}
-        for event_id, thumb_url in thumbnails:
-            if event_id not in thumbnails_by_event:
-                thumbnails_by_event[event_id] = []
-            thumbnails_by_event[event_id].append(thumb_url)
+    if limit is None:
+        return query_obj.all(), None, False
 
-        # Attach thumbnails to events
-        for event in events:
-            event.thumbnails = thumbnails_by_event.get(event.id, [])
+    events = query_obj.limit(limit + 1).all()
 
-    return events
+    has_more = len(events) > limit
+    if has_more:
+        events = events[:limit]
+
+    next_cursor = (
+        encode_cursor(events[-1].date, events[-1].id) if events and has_more else None
+    )
+
+    return events, next_cursor, has_more
 
 
 def get_event(db: Session, event_id: int, team_id: int) -> Event | None:
@@ -61,6 +98,13 @@ def get_event(db: Session, event_id: int, team_id: int) -> Event | None:
     )
 
 
+def get_event_list(db: Session, event_ids: list[int], team_id: int) -> list[Event]:
+    """Get the team's events by IDs (missing or foreign IDs are skipped)"""
+    return (
+        db.query(Event).filter(Event.id.in_(event_ids), Event.team_id == team_id).all()
+    )
+
+
 def create_event(
     db: Session,
     title: str,
@@ -71,17 +115,16 @@ def create_event(
     tags: list[str] | None = None,
 ):
     """Create a new event"""
-    tags_str = ",".join(tags) if tags else None
-
     event = Event(
         title=title,
         description=description,
         date=date,
         location=location,
-        tags=tags_str,
+        tags=_dedupe_tags(tags),
         team_id=team_id,
     )
     db.add(event)
+    _bump_team_version(db, team_id)
     db.commit()
 
 
@@ -104,14 +147,20 @@ def update_event(
     if location is not None:
         event.location = location
     if tags is not None:
-        event.tags = ",".join(tags) if tags else None
+        event.tags = _dedupe_tags(tags)
 
+    _bump_team_version(db, event.team_id)
     db.commit()
 
 
+def _dedupe_tags(tags: list[str] | None) -> list[str]:
+    return list(dict.fromkeys(tags)) if tags else []
+
+
 def delete_event(db: Session, event: Event) -> None:
     """Delete an event (only if no media is connected)"""
     db.delete(event)
+    _bump_team_version(db, event.team_id)
     db.commit()
 
 
@@ -128,18 +177,61 @@ def get_media(db: Session, media_id: int) -> Media | None:
     return db.query(Media).filter(Media.id == media_id).first()
 
 
+def get_media_list(db: Session, media_ids: list[int]) -> list[Media]:
+    """Get media by IDs (missing IDs are skipped)"""
+    return db.query(Media).filter(Media.id.in_(media_ids)).all()
+
+
 def create_media_bulk(
     db: Session,
     user_id: int,
     media_data_list: list[dict],
     team_id: int,
+    reserved_keys: list[str] | None = None,
 ) -> list[Media]:
+    # Calculate total size in KB from media_data_list
+    total_bytes = sum(data["file_size"] for data in media_data_list)
+    size_kb = math.ceil(total_bytes / 1024)
+
+    _lock_team(db, team_id)
+
+    # Confirmed uploads no longer hold a reservation
+    if reserved_keys:
+        db.query(StorageReservation).filter(
+            StorageReservation.team_id == team_id,
+            StorageReservation.key.in_(reserved_keys),
+        ).delete(synchronize_session=False)
+
+    # Check the quota (minus other uploads' reservations) and add the usage in
+    # one statement so concurrent uploads can neither lose an update nor both
+    # squeeze under the limit. The team row is already locked, so the
+    # reservation sum sees every reservation committed before this upload
+    updated = (
+        db.query(Team)
+        .filter(
+            Team.id == team_id,
+            Team.storage_used + _reserved_kb(team_id) + size_kb <= Team.storage_limit,
+        )
+        .update(
+            {
+                Team.storage_used: Team.storage_used + size_kb,
+                Team.version: Team.version + 1,
+            },
+            synchronize_session=False,
+        )
+    )
+    if not updated:
+        raise StorageLimitExceededError(team_id)
+
     media_objects = [
         Media(
             event_id=data["event_id"],
             user_id=user_id,
+            team_id=team_id,
             url=data["url"],
             thumb_url=data["thumb_url"],
+            s3_key=data.get("s3_key"),
+            thumb_s3_key=data.get("thumb_s3_key"),
             file_type=data["file_type"],
             file_size=data["file_size"],
             file_metadata=data.get("file_metadata"),
@@ -150,57 +242,270 @@ def create_media_bulk(
 
     db.add_all(media_objects)
 
-    # Calculate total size in KB from media_data_list
-    total_bytes = sum(data["file_size"] for data in media_data_list)
-    size_kb = math.ceil(total_bytes / 1024)
+    # The object keys are unique, so a concurrent confirm of the same upload
+    # fails here rather than charging the storage twice
+    try:
+        db.flush()
+    except IntegrityError as e:
+        db.rollback()
+        raise MediaAlreadyExistsError(team_id) from e
+
+    # Prepend new thumbnails to each event's preview (newest first)
+    thumbs_by_event = defaultdict(list)
+    for media in reversed(media_objects):
+        thumbs_by_event[media.event_id].append(media.thumb_url)
+
+    # Only the charged team's events; their previews share its version
+    events = (
+        db.query(Event)
+        .filter(Event.id.in_(thumbs_by_event), Event.team_id == team_id)
+        .all()
+    )
+    for event in events:
+        new_thumbs = thumbs_by_event[event.id]
+        event.media_count = (event.media_count or 0) + len(new_thumbs)
+        event.thumbnails = (new_thumbs + (event.thumbnails or []))[
+            :PREVIEW_THUMBNAIL_COUNT
+        ]
+
+    db.commit()
+
+    feed_cache.delete(team_id)
+
+
+def _lock_team(db: Session, team_id: int) -> None:
+    """
+    Take the team row's write lock with a no-op update
+    Statements after it see everything committed by writers that held the
+    lock before, including on PostgreSQL under READ COMMITTED
+    """
+    db.query(Team).filter(Team.id == team_id).update(
+        {Team.storage_used: Team.storage_used}, synchronize_session=False
+    )
+
+
+def _reserved_kb(team_id: int):
+    """Scalar subquery of the team's unexpired reservations in KB"""
+    return (
+        select(func.coalesce(func.sum(StorageReservation.size_kb), 0))
+        .where(
+            StorageReservation.team_id == team_id,
+            StorageReservation.expires_at > datetime.now(),
+        )
+        .scalar_subquery()
+    )
 
-    team = db.query(Team).filter(Team.id == team_id).first()
-    team.storage_used += size_kb
 
+def reserve_storage(
+    db: Session, team_id: int, sizes: dict[str, int], expires_at: datetime
+) -> None:
+    """
+    Reserve quota for presigned uploads, keyed by object key with sizes in bytes
+    A team that is already full cannot reserve, even with no sizes given
+    Raises StorageLimitExceededError if the reservations do not fit
+    """
+    size_kb = sum(math.ceil(size / 1024) for size in sizes.values())
+
+    # Sum the reservations only once the team row is locked, so it includes
+    # those of concurrent presigns that got the lock first
+    _lock_team(db, team_id)
+    in_use, storage_limit = (
+        db.query(Team.storage_used + _reserved_kb(team_id), Team.storage_limit)
+        .filter(Team.id == team_id)
+        .one()
+    )
+    if in_use >= storage_limit or in_use + size_kb > storage_limit:
+        raise StorageLimitExceededError(team_id)
+
+    db.query(StorageReservation).filter(
+        StorageReservation.team_id == team_id,
+        StorageReservation.expires_at <= datetime.now(),
+    ).delete(synchronize_session=False)
+    db.add_all(
+        StorageReservation(
+            key=key,
+            team_id=team_id,
+            size_kb=math.ceil(size / 1024),
+            expires_at=expires_at,
+        )
+        for key, size in sizes.items()
+    )
     db.commit()
 
 
 def delete_media(db: Session, media: Media, team_id: int) -> None:
+    delete_media_bulk(db, [media], team_id)
+
+
+def delete_media_bulk(db: Session, media_list: list[Media], team_id: int) -> None:
+    """
+    Delete several media of one team in a single transaction
+    Raises MediaNotFoundError, deleting nothing, if some are already gone
+    """
+    media_ids = {media.id for media in media_list}
+
+    # Lock the team row first, as create_media_bulk does, then re-read the
+    # media: a concurrent delete of the same rows that got the lock first must
+    # not have its size and count subtracted again
+    _lock_team(db, team_id)
+    media_list = (
+        db.query(Media).filter(Media.id.in_(media_ids)).populate_existing().all()
+    )
+    if len(media_list) != len(media_ids):
+        db.rollback()
+        raise MediaNotFoundError(team_id)
+
     # Calculate size in KB before deleting
-    size_kb = math.ceil(media.file_size / 1024) if media.file_size else 0
+    size_kb = sum(
+        math.ceil(media.file_size / 1024) for media in media_list if media.file_size
+    )
+
+    db.query(Team).filter(Team.id == team_id).update(
+        {
+            Team.storage_used: case(
+                (Team.storage_used > size_kb, Team.storage_used - size_kb), else_=0
+            ),
+            Team.version: Team.version + 1,
+        },
+        synchronize_session=False,
+    )
+
+    deleted_by_event = defaultdict(list)
+    for media in media_list:
+        deleted_by_event[media.event_id].append(media.thumb_url)
+        db.delete(media)
+    db.flush()
+
+    events = db.query(Event).filter(Event.id.in_(deleted_by_event)).all()
+    for event in events:
+        deleted_thumbs = deleted_by_event[event.id]
+        event.media_count = max((event.media_count or 0) - len(deleted_thumbs), 0)
+        if set(deleted_thumbs) & set(event.thumbnails or []):
+            event.thumbnails = _latest_thumbnails(db, event.id)
+
+    db.commit()
+
+    feed_cache.delete(team_id)
+
+
+def referenced_keys(db: Session, keys: list[str]) -> set[str]:
+    """Those of `keys` that some media still uses as original or thumbnail"""
+    if not keys:
+        return set()
+
+    originals = db.query(Media.s3_key).filter(Media.s3_key.in_(keys))
+    thumbnails = db.query(Media.thumb_s3_key).filter(Media.thumb_s3_key.in_(keys))
+    return {key for (key,) in originals.union(thumbnails)}
+
+
+def _latest_thumbnails(db: Session, event_id: int) -> list[str]:
+    rows = (
+        db.query(Media.thumb_url)
+        .filter(Media.event_id == event_id)
+        .order_by(Media.created_at.desc(), Media.id.desc())
+        .limit(PREVIEW_THUMBNAIL_COUNT)
+    )
+    return [thumb_url for (thumb_url,) in rows]
 
-    db.delete(media)
 
-    team = db.query(Team).filter(Team.id == team_id).first()
-    team.storage_used -= size_kb
-    if team.storage_used < 0:
-        team.storage_used = 0
+def refresh_event_preview(db: Session, event_id: int) -> None:
+    """Recompute an event's media count and thumbnails from its media"""
+    event = db.query(Event).filter(Event.id == event_id).first()
+    if not event:
+        return
 
+    event.media_count = db.query(Media).filter(Media.event_id == event_id).count()
+    event.thumbnails = _latest_thumbnails(db, event_id)
+    _bump_team_version(db, event.team_id)
     db.commit()
 
+    feed_cache.delete(event.team_id)
+
+
+def sync_media_team(
+    db: Session, event_id: int, previous_team_id: int | None = None
+) -> None:
+    """
+    Move an event's media, and the storage they use, to the event's team
+    For edits that bypass the API, such as changing an event's team in the admin
+    `previous_team_id` is the event's team before the edit, if it changed
+    """
+    event = db.query(Event).filter(Event.id == event_id).first()
+    if not event:
+        return
+
+    moved = (
+        db.query(Media)
+        .filter(Media.event_id == event_id, Media.team_id != event.team_id)
+        .all()
+    )
+    size_by_team = defaultdict(int)
+    for media in moved:
+        size_by_team[media.team_id] += math.ceil((media.file_size or 0) / 1024)
+        media.team_id = event.team_id
+
+    for team_id, size_kb in size_by_team.items():
+        db.query(Team).filter(Team.id == team_id).update(
+            {
+                Team.storage_used: case(
+                    (Team.storage_used > size_kb, Team.storage_used - size_kb),
+                    else_=0,
+                )
+            },
+            synchronize_session=False,
+        )
+    db.query(Team).filter(Team.id == event.team_id).update(
+        {Team.storage_used: Team.storage_used + sum(size_by_team.values())},
+        synchronize_session=False,
+    )
+
+    stale_teams = {event.team_id, *size_by_team}
+    if previous_team_id:
+        stale_teams.add(previous_team_id)
+    for team_id in stale_teams:
+        _bump_team_version(db, team_id)
+    db.commit()
+
+    for team_id in stale_teams:
+        feed_cache.delete(team_id)
+
 
 def get_media_feed(
-    db: Session, limit: int = 20, cursor: int | None = None, team_id: int | None = None
-) -> tuple[list[Media], int | None, bool]:
+    db: Session,
+    limit: int = 20,
+    cursor: str | None = None,
+    team_id: int | None = None,
+) -> tuple[list[Media], str | None, bool]:
     """
-    Get media feed with pagination (with user join)
+    Get media feed with keyset pagination (with user join)
+    `cursor` is an opaque (created_at, id) cursor; legacy numeric media ids are
+    still accepted
     Returns: (media_list, next_cursor, has_more)
     """
     query_obj = (
         db.query(Media)
-        .join(Media.event)
         .options(joinedload(Media.user))
         .order_by(Media.created_at.desc(), Media.id.desc())
     )
 
     # Filter by team
     if team_id is not None:
-        query_obj = query_obj.filter(Event.team_id == team_id)
+        query_obj = query_obj.filter(Media.team_id == team_id)
 
     if cursor:
-        cursor_media = db.query(Media).filter(Media.id == cursor).first()
-        if cursor_media:
+        if cursor.isdigit():
+            cursor_media = db.query(Media).filter(Media.id == int(cursor)).first()
+            position = (
+                (cursor_media.created_at, cursor_media.id) if cursor_media else None
+            )
+        else:
+            position = decode_cursor(cursor)
+
+        if position:
+            created_at, media_id = position
             query_obj = query_obj.filter(
-                (Media.created_at < cursor_media.created_at)
-                | (
-                    (Media.created_at == cursor_media.created_at)
-                    & (Media.id < cursor_media.id)
-                )
+                (Media.created_at < created_at)
+                | ((Media.created_at == created_at) & (Media.id < media_id))
             )
 
     media_list = query_obj.limit(limit + 1).all()
@@ -209,7 +514,11 @@ def get_media_feed(
     if has_more:
         media_list = media_list[:limit]
 
-    next_cursor = media_list[-1].id if media_list and has_more else None
+    next_cursor = (
+        encode_cursor(media_list[-1].created_at, media_list[-1].id)
+        if media_list and has_more
+        else None
+    )
 
     return media_list, next_cursor, has_more
 
@@ -232,6 +541,32 @@ def list_users(db: Session, team_id: int) -> list[User]:
     return db.query(User).filter(User.team_id == team_id).all()
 
 
+def _team_members(users) -> tuple[TeamMember, ...]:
+    return tuple(
+        TeamMember(
+            id=u.id,
+            name=u.name,
+            expo_push_token=u.expo_push_token,
+            profile_img=u.profile_img,
+        )
+        for u in users
+    )
+
+
+def get_team_roster(db: Session, team_id: int) -> tuple[TeamMember, ...]:
+    """Members of a team, served from `roster_cache` when possible"""
+    roster = roster_cache.get(team_id)
+    if roster is None:
+        # Taken before the read, so a concurrent update_user wins over this fill
+        generation = roster_cache.generation(team_id)
+        rows = db.query(
+            User.id, User.name, User.expo_push_token, User.profile_img
+        ).filter(User.team_id == team_id)
+        roster = _team_members(rows)
+        roster_cache.set(team_id, roster, generation)
+    return roster
+
+
 def update_user(
     db: Session,
     user_id: int,
@@ -246,9 +581,85 @@ def update_user(
         user.profile_img = profile_img
     db.commit()
 
+    user_cache.delete(user.api_key)
+    roster_cache.delete(user.team_id)
+
+
+def clear_push_tokens(db: Session, tokens: list[str]) -> None:
+    """Remove push tokens that Expo reported as no longer registered"""
+    team_ids = {
+        team_id
+        for (team_id,) in db.query(User.team_id)
+        .filter(User.expo_push_token.in_(tokens))
+        .distinct()
+    }
+    db.query(User).filter(User.expo_push_token.in_(tokens)).update(
+        {User.expo_push_token: None}, synchronize_session=False
+    )
+    db.commit()
+
+    for team_id in team_ids:
+        roster_cache.delete(team_id)
+
 
 # Team queries
 
 
 def get_team(db: Session, team_id: int) -> Team:
     return db.query(Team).filter(Team.id == team_id).first()
+
+
+def get_team_with_users(db: Session, team_id: int) -> Team | None:
+    """Team with its users loaded in the same query"""
+    return (
+        db.query(Team)
+        .options(joinedload(Team.users))
+        .filter(Team.id == team_id)
+        .first()
+    )
+
+
+def get_team_with_roster(
+    db: Session, team_id: int, fill_cache: bool = False
+) -> tuple[Team | None, tuple[TeamMember, ...]]:
+    """
+    Team and its roster; reads only the team row when the roster is cached,
+    otherwise loads both in one query
+    Set `fill_cache` only when `db` reads from the primary; a roster read from a
+    lagging replica must not end up in `roster_cache`
+    """
+    roster = roster_cache.get(team_id)
+    if roster is not None:
+        return get_team(db, team_id), roster
+
+    generation = roster_cache.generation(team_id)
+    team = get_team_with_users(db, team_id)
+    if not team:
+        return None, ()
+
+    roster = _team_members(team.users)
+    if fill_cache:
+        roster_cache.set(team_id, roster, generation)
+    return team, roster
+
+
+def get_team_version(db: Session, team_id: int) -> int:
+    """Version of the team's events and media, bumped on every write to them"""
+    return db.query(Team.version).filter(Team.id == team_id).scalar() or 0
+
+
+def bump_team_version(db: Session, team_id: int) -> None:
+    """
+    Mark the team's events and media as changed
+    For edits that bypass the API, such as event or user edits in the admin
+    """
+    _bump_team_version(db, team_id)
+    db.commit()
+
+    feed_cache.delete(team_id)
+
+
+def _bump_team_version(db: Session, team_id: int) -> None:
+    db.query(Team).filter(Team.id == team_id).update(
+        {Team.version: Team.version + 1}, synchronize_session=False
+    )
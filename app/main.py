@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from sqladmin import Admin
 from starlette.middleware.sessions import SessionMiddleware
@@ -6,10 +8,21 @@ from app.admin import AdminAuth, EventAdmin, MediaAdmin, TeamAdmin, UserAdmin
 from app.db.connection import engine
 from app.routers import events, media, users
 from app.utils.config import get_settings
+from app.utils.push_notification import push_dispatcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    push_dispatcher.start()
+    yield
+    # Deliver queued push notifications before the worker exits
+    push_dispatcher.shutdown()
+
 
 app = FastAPI(
     title="Timjs Backend API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(SessionMiddleware, secret_key=get_settings().admin_secret_key)
@@ -1,28 +1,53 @@
+from dataclasses import dataclass
 from typing import Annotated
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.db import query
-from app.db.models import User
 from app.middlewares.db import DBContext
+from app.utils.cache import user_cache
 
 security = HTTPBearer()
 Credentials = Annotated[HTTPAuthorizationCredentials, Depends(security)]
 
 
-async def _get_current_user(credentials: Credentials, db: DBContext) -> User:
+@dataclass(frozen=True)
+class CurrentUser:
+    """Snapshot of the authenticated user, detached from the DB session"""
+
+    id: int
+    team_id: int
+    name: str
+    profile_img: str | None = None
+
+
+def _get_current_user(credentials: Credentials, db: DBContext) -> CurrentUser:
     token = credentials.credentials
 
     if not token:
         raise HTTPException(status_code=401, detail="API key is required")
 
+    current_user = user_cache.get(token)
+    if current_user:
+        return current_user
+
+    # Taken before the read, so a concurrent update_user wins over this fill
+    generation = user_cache.generation(token)
     user = query.get_user(db, api_key=token)
 
     if not user:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
-    return user
+    current_user = CurrentUser(
+        id=user.id,
+        team_id=user.team_id,
+        name=user.name,
+        profile_img=user.profile_img,
+    )
+    user_cache.set(token, current_user, generation)
+
+    return current_user
 
 
-AuthContext = Annotated[User, Depends(_get_current_user)]
+AuthContext = Annotated[CurrentUser, Depends(_get_current_user)]
@@ -3,9 +3,11 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
-from app.db.connection import SessionLocal
+from app.db.connection import ReadSessionLocal, SessionLocal
 
 
+# Sessions are synchronous, so routers using them are declared with plain `def`
+# and FastAPI runs them in its threadpool instead of blocking the event loop.
 def _get_db():
     """Dependency to get DB session"""
     db = SessionLocal()
@@ -15,4 +17,14 @@ def _get_db():
         db.close()
 
 
+def _get_read_db():
+    """Dependency to get a session on the read-only engine"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 DBContext = Annotated[Session, Depends(_get_db)]
+ReadDBContext = Annotated[Session, Depends(_get_read_db)]
@@ -1,33 +1,79 @@
-from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
 
 from app.db import query
 from app.middlewares.auth import AuthContext
-from app.middlewares.db import DBContext
+from app.middlewares.db import DBContext, ReadDBContext
 from app.schemas import EventCreate, EventResponse, EventUpdate
+from app.utils.etag import is_not_modified, team_etag
 from app.utils.push_notification import send_push_notification
+from app.utils.serialization import build_model, serialize_response
 
 router = APIRouter()
 
+event_list_adapter = TypeAdapter(list[EventResponse])
+
 
 @router.get("", response_model=list[EventResponse])
-async def get_events(db: DBContext, user: AuthContext):
-    events = query.list_events(db, user.team_id)
-    return [
-        EventResponse(
+def get_events(
+    db: ReadDBContext,
+    user: AuthContext,
+    request: Request,
+    response: Response,
+    limit: Annotated[int | None, Query(ge=1, le=100)] = None,
+    cursor: str | None = None,
+    date_from: Annotated[datetime | None, Query(alias="from")] = None,
+    date_to: Annotated[datetime | None, Query(alias="to")] = None,
+    tag: str | None = None,
+):
+    """
+    List team events, newest first
+    With `limit`, the cursor for the next page is returned in `X-Next-Cursor`
+    """
+    etag = team_etag(user.team_id, query.get_team_version(db, user.team_id))
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    try:
+        events, next_cursor, _ = query.list_events(
+            db,
+            user.team_id,
+            limit=limit,
+            cursor=cursor,
+            date_from=date_from,
+            date_to=date_to,
+            tag=tag,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+    items = [
+        build_model(
+            EventResponse,
             id=e.id,
             title=e.title,
             description=e.description,
             date=e.date,
             location=e.location,
-            tags=e.tags.split(",") if e.tags else [],
-            thumbnails=getattr(e, "thumbnails", []),
+            tags=list(e.tags),
+            thumbnails=e.thumbnails or [],
+            media_count=e.media_count or 0,
         )
         for e in events
     ]
 
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+
+    return serialize_response(response, items, event_list_adapter, headers)
+
 
 @router.post("", status_code=204)
-async def create_event(db: DBContext, user: AuthContext, event: EventCreate):
+def create_event(db: DBContext, user: AuthContext, event: EventCreate):
     """
     Create a new event
     """
@@ -42,8 +88,10 @@ async def create_event(db: DBContext, user: AuthContext, event: EventCreate):
     )
 
     # Send push notifications to team members except the creator
-    users = query.list_users(db, user.team_id)
-    tokens = [u.expo_push_token for u in users if u.expo_push_token and u.id != user.id]
+    roster = query.get_team_roster(db, user.team_id)
+    tokens = [
+        m.expo_push_token for m in roster if m.expo_push_token and m.id != user.id
+    ]
     send_push_notification(
         tokens=tokens,
         title=event.title,
@@ -53,7 +101,7 @@ async def create_event(db: DBContext, user: AuthContext, event: EventCreate):
 
 
 @router.put("/{event_id}", status_code=204)
-async def update_event(
+def update_event(
     db: DBContext, user: AuthContext, event_id: int, event_update: EventUpdate
 ):
     """
@@ -75,7 +123,7 @@ async def update_event(
 
 
 @router.delete("/{event_id}", status_code=204)
-async def delete_event(db: DBContext, user: AuthContext, event_id: int):
+def delete_event(db: DBContext, user: AuthContext, event_id: int):
     """
     Delete an event (연결된 media가 없는 event만 삭제 가능)
     """
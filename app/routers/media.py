@@ -2,33 +2,51 @@
 Media API endpoints
 """
 
-import json
-import math
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
 
 from app.db import query
+from app.db.models import Media
 from app.middlewares.auth import AuthContext
-from app.middlewares.db import DBContext
+from app.middlewares.db import DBContext, ReadDBContext
 from app.schemas import (
     ConfirmUploadListRequest,
+    DeleteMediaListRequest,
     MediaFeedResponse,
     MediaListItem,
+    PresignedUploadFile,
+    PresignedUploadListRequest,
+    PresignedUploadListResponse,
     PresignedUploadRequest,
     PresignedUploadResponse,
     PresignedUrlData,
     UserSummary,
 )
+from app.utils.cache import feed_cache
 from app.utils.config import get_settings
+from app.utils.etag import is_not_modified, team_etag
 from app.utils.push_notification import send_push_notification
-from app.utils.s3 import MediaType, s3_client
+from app.utils.s3 import (
+    MAX_UPLOAD_SIZE,
+    PRESIGNED_URL_EXPIRATION,
+    MediaType,
+    is_upload_key,
+    s3_client,
+)
+from app.utils.serialization import build_model, json_response, serialize_response
 
 router = APIRouter()
 
+FEED_PAGE_SIZE = 50
+
+feed_adapter = TypeAdapter(MediaFeedResponse)
+
 
 @router.post("/presigned-url", response_model=PresignedUploadResponse)
-async def get_presigned_upload_url(
+def get_presigned_upload_url(
     db: DBContext, user: AuthContext, request: PresignedUploadRequest
 ):
     """
@@ -38,72 +56,80 @@ async def get_presigned_upload_url(
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    team = query.get_team(db, user.team_id)
-    if team.storage_used >= team.storage_limit:
-        raise HTTPException(
-            status_code=403,
-            detail="Storage limit exceeded.",
-        )
-
-    original = s3_client.generate_presigned_post(
-        file_name=request.file_name,
-        content_type=request.content_type,
-        event_s3_key=event.s3_key,
-        media_type=MediaType.ORIGINAL,
-    )
+    [item] = _presign_uploads(db, user.team_id, event.s3_key, [request])
+    return item
 
-    thumbnail = s3_client.generate_presigned_post(
-        file_name=request.file_name,
-        content_type=request.content_type,
-        event_s3_key=event.s3_key,
-        media_type=MediaType.THUMBNAIL,
-    )
 
-    if not original or not thumbnail:
-        raise HTTPException(status_code=500, detail="Failed to generate presigned URL")
+@router.post("/presigned-urls", response_model=PresignedUploadListResponse)
+def get_presigned_upload_urls(
+    db: DBContext, user: AuthContext, request: PresignedUploadListRequest
+):
+    """
+    Get presigned URLs for several files of the same event in one request
+    Quota for all files is reserved together
+    """
+    event = query.get_event(db, request.event_id, user.team_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
 
-    return PresignedUploadResponse(
-        original=PresignedUrlData(
-            url=original["url"], fields=original["fields"], key=original["key"]
-        ),
-        thumbnail=PresignedUrlData(
-            url=thumbnail["url"], fields=thumbnail["fields"], key=thumbnail["key"]
-        ),
+    return PresignedUploadListResponse(
+        items=_presign_uploads(db, user.team_id, event.s3_key, request.files)
     )
 
 
 @router.post("", status_code=204)
-async def create_media(
-    db: DBContext, user: AuthContext, request: ConfirmUploadListRequest
-):
+def create_media(db: DBContext, user: AuthContext, request: ConfirmUploadListRequest):
     """
     Confirm upload and create multiple media records
     Fetches actual file metadata from S3 for validation
     """
-    # Get current storage usage first
-    team = query.get_team(db, user.team_id)
-    storage_used, storage_limit = team.storage_used, team.storage_limit
+    event_ids = {media.event_id for media in request.media_list}
+    events = query.get_event_list(db, list(event_ids), user.team_id)
+    if len(events) != len(event_ids):
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    # Only objects presigned for the event may be attached to it
+    event_s3_keys = {event.id: event.s3_key for event in events}
+    for media in request.media_list:
+        event_s3_key = event_s3_keys[media.event_id]
+        for key, media_type in (
+            (media.s3_key, MediaType.ORIGINAL),
+            (media.thumb_s3_key, MediaType.THUMBNAIL),
+        ):
+            if not is_upload_key(key, media_type, event_s3_key):
+                raise HTTPException(status_code=400, detail=f"Invalid S3 key: {key}")
+
+    # Every object belongs to exactly one media
+    original_keys = [media.s3_key for media in request.media_list]
+    thumb_keys = [media.thumb_s3_key for media in request.media_list]
+    keys = original_keys + thumb_keys
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail="Duplicate S3 key")
+    if query.referenced_keys(db, keys):
+        raise HTTPException(status_code=409, detail="Media already exists")
+
+    # HEAD every file concurrently, then verify them in order
+    metadata_list = s3_client.get_files_metadata(keys)
+    count = len(original_keys)
+    original_metadata_list = metadata_list[:count]
+    thumb_metadata_list = metadata_list[count:]
 
-    # Verify files, check storage, and build data list in one pass
-    total_upload_size = 0
     media_data_list = []
     settings = get_settings()
     now = datetime.now()
 
-    for media in request.media_list:
-        metadata = s3_client.get_file_metadata(media.s3_key)
-
-        if not metadata:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File not found in S3: {media.s3_key}",
-            )
-
-        total_upload_size += metadata["size"]
-        upload_size_kb = math.ceil(total_upload_size / 1024)
-
-        if storage_used + upload_size_kb > storage_limit:
-            raise HTTPException(status_code=403, detail="Storage limit exceeded.")
+    for media, metadata, thumb_metadata in zip(
+        request.media_list, original_metadata_list, thumb_metadata_list, strict=True
+    ):
+        for key, found in (
+            (media.s3_key, metadata),
+            (media.thumb_s3_key, thumb_metadata),
+        ):
+            if not found:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File not found in S3: {key}",
+                )
 
         url = f"https://{settings.s3_bucket_name}.s3.{settings.aws_region}.amazonaws.com/{media.s3_key}"
         thumb_url = f"https://{settings.s3_bucket_name}.s3.{settings.aws_region}.amazonaws.com/{media.thumb_s3_key}"
@@ -113,25 +139,34 @@ async def create_media(
                 "event_id": media.event_id,
                 "url": url,
                 "thumb_url": thumb_url,
+                "s3_key": media.s3_key,
+                "thumb_s3_key": media.thumb_s3_key,
                 "file_type": metadata["content_type"],
                 "file_size": metadata["size"],
-                "file_metadata": json.dumps(media.file_metadata)
-                if media.file_metadata
-                else None,
+                "file_metadata": media.file_metadata or None,
                 "created_at": now,
             }
         )
 
-    query.create_media_bulk(
-        db=db,
-        user_id=user.id,
-        media_data_list=media_data_list,
-        team_id=user.team_id,
-    )
+    # Storage limit is checked atomically with the usage update
+    try:
+        query.create_media_bulk(
+            db=db,
+            user_id=user.id,
+            media_data_list=media_data_list,
+            team_id=user.team_id,
+            reserved_keys=original_keys,
+        )
+    except query.StorageLimitExceededError as e:
+        raise HTTPException(status_code=403, detail="Storage limit exceeded.") from e
+    except query.MediaAlreadyExistsError as e:
+        raise HTTPException(status_code=409, detail="Media already exists") from e
 
     # Send push notification to team members
-    users = query.list_users(db, user.team_id)
-    tokens = [u.expo_push_token for u in users if u.expo_push_token and u.id != user.id]
+    roster = query.get_team_roster(db, user.team_id)
+    tokens = [
+        m.expo_push_token for m in roster if m.expo_push_token and m.id != user.id
+    ]
 
     count = len(media_data_list)
     body = (
@@ -149,40 +184,94 @@ async def create_media(
 
 
 @router.get("", response_model=MediaFeedResponse)
-async def get_media_feed(db: DBContext, user: AuthContext, cursor: int | None = None):
-    media_list, next_cursor, has_more = query.get_media_feed(
-        db, limit=50, cursor=cursor, team_id=user.team_id
+def get_media_feed(
+    db: ReadDBContext,
+    user: AuthContext,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+):
+    version = query.get_team_version(db, user.team_id)
+    etag = team_etag(user.team_id, version)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # The first page is shared by the whole team
+    if cursor is None:
+        cached = feed_cache.get(user.team_id)
+        if cached and cached[0] == version:
+            return json_response(cached[1], {"ETag": etag})
+
+    try:
+        media_list, next_cursor, has_more = query.get_media_feed(
+            db, limit=FEED_PAGE_SIZE, cursor=cursor, team_id=user.team_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+    items = [
+        build_model(
+            MediaListItem,
+            id=media.id,
+            event_id=media.event_id,
+            user=build_model(UserSummary, id=media.user.id, name=media.user.name),
+            url=media.url,
+            thumb_url=media.thumb_url,
+            file_type=media.file_type,
+            file_size=media.file_size,
+            file_metadata=media.file_metadata,
+            created_at=media.created_at,
+        )
+        for media in media_list
+    ]
+    feed = build_model(
+        MediaFeedResponse, items=items, cursor=next_cursor, has_more=has_more
     )
 
-    items = []
+    # Cache the serialized page so hits are a plain memory lookup
+    if cursor is None:
+        content = feed_adapter.dump_json(feed)
+        feed_cache.set(user.team_id, (version, content))
+        return json_response(content, {"ETag": etag})
+
+    return serialize_response(response, feed, feed_adapter, {"ETag": etag})
+
+
+@router.post("/delete", status_code=204)
+def delete_media_list(
+    db: DBContext,
+    user: AuthContext,
+    request: DeleteMediaListRequest,
+    background_tasks: BackgroundTasks,
+):
+    """
+    Delete multiple media at once (only uploader can delete)
+    Either every media is deleted or none is
+    """
+    media_ids = set(request.media_ids)
+    media_list = query.get_media_list(db, list(media_ids))
+    if len(media_list) != len(media_ids):
+        raise HTTPException(status_code=404, detail="Media not found")
+
     for media in media_list:
-        # Parse file_metadata safely
-        metadata = None
-        if media.file_metadata:
-            try:
-                metadata = json.loads(media.file_metadata)
-            except (json.JSONDecodeError, TypeError):
-                metadata = None
-
-        items.append(
-            MediaListItem(
-                id=media.id,
-                event_id=media.event_id,
-                user=UserSummary(id=media.user.id, name=media.user.name),
-                url=media.url,
-                thumb_url=media.thumb_url,
-                file_type=media.file_type,
-                file_size=media.file_size,
-                file_metadata=metadata,
-                created_at=media.created_at,
+        if media.team_id != user.team_id or media.user_id != user.id:
+            raise HTTPException(
+                status_code=403, detail="Not authorized to delete this media"
             )
-        )
 
-    return MediaFeedResponse(items=items, cursor=next_cursor, has_more=has_more)
+    keys = _object_keys(media_list)
+    try:
+        query.delete_media_bulk(db, media_list, user.team_id)
+    except query.MediaNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Media not found") from e
+
+    _delete_unreferenced(db, keys, background_tasks)
 
 
 @router.delete("/{media_id}", status_code=204)
-async def delete_media(db: DBContext, user: AuthContext, media_id: int):
+def delete_media(
+    db: DBContext, user: AuthContext, media_id: int, background_tasks: BackgroundTasks
+):
     """
     Delete media (only uploader can delete)
     """
@@ -190,15 +279,86 @@ async def delete_media(db: DBContext, user: AuthContext, media_id: int):
     if not media:
         raise HTTPException(status_code=404, detail="Media not found")
 
-    event = query.get_event(db, media.event_id, user.team_id)
-    if event and event.team_id != user.team_id:
+    if media.team_id != user.team_id or media.user_id != user.id:
         raise HTTPException(
             status_code=403, detail="Not authorized to delete this media"
         )
 
-    if media.user_id != user.id:
-        raise HTTPException(
-            status_code=403, detail="Not authorized to delete this media"
+    keys = _object_keys([media])
+    try:
+        query.delete_media(db, media, user.team_id)
+    except query.MediaNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Media not found") from e
+
+    _delete_unreferenced(db, keys, background_tasks)
+
+
+def _object_keys(media_list: list[Media]) -> list[str]:
+    """S3 keys of the original and thumbnail of each media"""
+    keys = (
+        key for media in media_list for key in (media.s3_key, media.thumb_s3_key) if key
+    )
+    return list(dict.fromkeys(keys))
+
+
+def _delete_unreferenced(
+    db: Session, keys: list[str], background_tasks: BackgroundTasks
+) -> None:
+    # Never remove an object another media row still points at
+    referenced = query.referenced_keys(db, keys)
+    keys = [key for key in keys if key not in referenced]
+    if keys:
+        background_tasks.add_task(s3_client.delete_files, keys)
+
+
+def _presign_uploads(
+    db: Session,
+    team_id: int,
+    event_s3_key: str,
+    files: list[PresignedUploadFile],
+) -> list[PresignedUploadResponse]:
+    posts = []
+    sizes = {}
+    for file in files:
+        original = s3_client.generate_presigned_post(
+            file_name=file.file_name,
+            content_type=file.content_type,
+            event_s3_key=event_s3_key,
+            media_type=MediaType.ORIGINAL,
+            max_size=file.file_size or MAX_UPLOAD_SIZE,
         )
 
-    query.delete_media(db, media, user.team_id)
+        thumbnail = s3_client.generate_presigned_post(
+            file_name=file.file_name,
+            content_type=file.content_type,
+            event_s3_key=event_s3_key,
+            media_type=MediaType.THUMBNAIL,
+        )
+
+        if not original or not thumbnail:
+            raise HTTPException(
+                status_code=500, detail="Failed to generate presigned URL"
+            )
+
+        if file.file_size:
+            sizes[original["key"]] = file.file_size
+        posts.append((original, thumbnail))
+
+    # Hold the quota until the upload is confirmed or the URL expires
+    expires_at = datetime.now() + timedelta(seconds=PRESIGNED_URL_EXPIRATION)
+    try:
+        query.reserve_storage(db, team_id, sizes, expires_at)
+    except query.StorageLimitExceededError as e:
+        raise HTTPException(status_code=403, detail="Storage limit exceeded.") from e
+
+    return [
+        PresignedUploadResponse(
+            original=PresignedUrlData(
+                url=original["url"], fields=original["fields"], key=original["key"]
+            ),
+            thumbnail=PresignedUrlData(
+                url=thumbnail["url"], fields=thumbnail["fields"], key=thumbnail["key"]
+            ),
+        )
+        for original, thumbnail in posts
+    ]
@@ -4,9 +4,9 @@ User API endpoints
 
 from fastapi import APIRouter, HTTPException
 
-from app.db import query
+from app.db import connection, query
 from app.middlewares.auth import AuthContext
-from app.middlewares.db import DBContext
+from app.middlewares.db import DBContext, ReadDBContext
 from app.schemas import (
     FriendSummary,
     PresignedUrlData,
@@ -21,16 +21,17 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=UserMeResponse)
-async def get_me(db: DBContext, user: AuthContext):
-    team_users = query.list_users(db, team_id=user.team_id)
+def get_me(db: ReadDBContext, user: AuthContext):
+    # Without a replica the read session is on the primary and may fill the cache
+    team, roster = query.get_team_with_roster(
+        db, user.team_id, fill_cache=connection.read_engine is connection.engine
+    )
     friends = [
-        FriendSummary(id=u.id, name=u.name, profile_img=u.profile_img)
-        for u in team_users
-        if u.id != user.id
+        FriendSummary(id=m.id, name=m.name, profile_img=m.profile_img)
+        for m in roster
+        if m.id != user.id
     ]
 
-    team = query.get_team(db, user.team_id)
-
     return UserMeResponse(
         id=user.id,
         name=user.name,
@@ -43,7 +44,7 @@ async def get_me(db: DBContext, user: AuthContext):
 
 
 @router.put("/push-token", status_code=204)
-async def update_push_token(
+def update_push_token(
     db: DBContext, user: AuthContext, request: UpdatePushTokenRequest
 ):
     """
@@ -53,7 +54,7 @@ async def update_push_token(
 
 
 @router.post("/profile-image/presigned-url", response_model=PresignedUrlData)
-async def get_profile_image_presigned_url(
+def get_profile_image_presigned_url(
     user: AuthContext, request: ProfileImagePresignedRequest
 ):
     """
@@ -77,7 +78,7 @@ async def get_profile_image_presigned_url(
 
 
 @router.put("/profile-image", status_code=204)
-async def update_profile_image(
+def update_profile_image(
     db: DBContext, user: AuthContext, request: UpdateProfileImageRequest
 ):
     """
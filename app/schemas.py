@@ -1,6 +1,10 @@
 from datetime import datetime
+from typing import Annotated
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+
+# Fits EventTag.tag
+Tag = Annotated[str, StringConstraints(min_length=1, max_length=100)]
 
 
 # Event schemas
@@ -9,7 +13,7 @@ class EventBase(BaseModel):
     description: str | None = None
     date: datetime
     location: str | None = None
-    tags: list[str] | None = []
+    tags: list[Tag] | None = []
 
 
 class EventCreate(EventBase):
@@ -21,7 +25,7 @@ class EventUpdate(BaseModel):
     description: str | None = None
     date: datetime | None = None
     location: str | None = None
-    tags: list[str] | None = None
+    tags: list[Tag] | None = None
 
 
 class EventResponse(EventBase):
@@ -29,6 +33,7 @@ class EventResponse(EventBase):
 
     id: int
     thumbnails: list[str] = []
+    media_count: int = 0
 
 
 # Media schemas
@@ -55,14 +60,24 @@ class MediaListItem(BaseModel):
 
 class MediaFeedResponse(BaseModel):
     items: list[MediaListItem]
-    cursor: int | None = None
+    cursor: str | None = None
     has_more: bool
 
 
-class PresignedUploadRequest(BaseModel):
+class PresignedUploadFile(BaseModel):
     file_name: str
     content_type: str
+    # Bytes; when given, quota is reserved and larger uploads are rejected
+    file_size: int | None = Field(None, gt=0)
+
+
+class PresignedUploadRequest(PresignedUploadFile):
+    event_id: int
+
+
+class PresignedUploadListRequest(BaseModel):
     event_id: int
+    files: list[PresignedUploadFile] = Field(min_length=1, max_length=500)
 
 
 class PresignedUrlData(BaseModel):
@@ -76,6 +91,10 @@ class PresignedUploadResponse(BaseModel):
     thumbnail: PresignedUrlData
 
 
+class PresignedUploadListResponse(BaseModel):
+    items: list[PresignedUploadResponse]
+
+
 class MediaUploadItem(BaseModel):
     s3_key: str
     thumb_s3_key: str
@@ -87,6 +106,10 @@ class ConfirmUploadListRequest(BaseModel):
     media_list: list[MediaUploadItem]
 
 
+class DeleteMediaListRequest(BaseModel):
+    media_ids: list[int] = Field(min_length=1, max_length=500)
+
+
 # User schemas
 class FriendSummary(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,96 @@
+"""
+In-process caches
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from app.utils.config import get_settings
+
+settings = get_settings()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after being set
+
+    Fills that read from the DB should take `generation(key)` before reading
+    and pass it to `set`; a `delete` or `clear` in between then drops the
+    fill instead of caching what it read before the invalidating write
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped per key by delete and for every key by clear
+        self._generations: dict[Hashable, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, key: Hashable) -> tuple[int, int]:
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set(
+        self, key: Hashable, value: Any, generation: tuple[int, int] | None = None
+    ) -> None:
+        with self._lock:
+            if generation is not None and generation != (
+                self._epoch,
+                self._generations.get(key, 0),
+            ):
+                return
+
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# api_key -> CurrentUser snapshot
+user_cache = TTLCache(maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl)
+
+# team_id -> (team version, serialized first page of the media feed)
+feed_cache = TTLCache(maxsize=settings.feed_cache_size, ttl=settings.feed_cache_ttl)
+
+# team_id -> tuple of TeamMember snapshots
+roster_cache = TTLCache(
+    maxsize=settings.roster_cache_size, ttl=settings.roster_cache_ttl
+)
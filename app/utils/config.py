@@ -8,16 +8,52 @@ class Settings(BaseSettings):
     model_config = ConfigDict(env_file=".env", case_sensitive=False)
 
     database_url: str = "sqlite:////data/timjs.db"
+    # Read-only connection for feed/list queries, e.g. a replica, or
+    # sqlite:///file:/data/timjs.db?mode=ro&uri=true. Empty reuses database_url
+    database_read_url: str = ""
+
+    # Connection pool for server databases such as PostgreSQL
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800  # seconds
+    db_statement_timeout: int = 30000  # milliseconds, 0 disables
+
+    # Pragmas applied to every new SQLite connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout: int = 5000  # milliseconds
+    sqlite_cache_size: int = -64000  # negative means KiB, so 64MB
+    sqlite_mmap_size: int = 268435456  # 256MB
+    sqlite_temp_store: str = "MEMORY"
 
     aws_access_key_id: str = ""
     aws_secret_access_key: str = ""
     aws_region: str = "ap-northeast-2"
     s3_bucket_name: str = ""
+    s3_max_concurrency: int = 16
+    s3_max_pool_connections: int = 32  # never fewer than s3_max_concurrency
+    s3_connect_timeout: float = 5.0  # seconds
+    s3_read_timeout: float = 30.0  # seconds
+    s3_max_attempts: int = 3
+    s3_retry_mode: str = "standard"
+    s3_tcp_keepalive: bool = True
 
     admin_username: str = "admin"
     admin_password: str = ""
     admin_secret_key: str = ""
 
+    auth_cache_size: int = 1024
+    auth_cache_ttl: int = 60  # seconds
+    # Build feed/event list responses without validation and serialize them
+    # directly, skipping FastAPI's response_model pass
+    fast_serialization: bool = False
+
+    feed_cache_size: int = 256
+    feed_cache_ttl: int = 300  # seconds
+    roster_cache_size: int = 256
+    roster_cache_ttl: int = 300  # seconds
+
 
 @lru_cache
 def get_settings():
@@ -0,0 +1,24 @@
+"""
+Opaque keyset pagination cursors
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+
+def encode_cursor(sort_key: datetime, id: int) -> str:
+    """Encode the (sort_key, id) of the last row of a page"""
+    raw = f"{sort_key.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor made by `encode_cursor`, raising ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded).decode()
+        sort_key, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(sort_key), int(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,19 @@
+"""
+ETag helpers for conditional GET
+"""
+
+from fastapi import Request
+
+
+def team_etag(team_id: int, version: int) -> str:
+    return f'W/"{team_id}-{version}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already matches `etag`"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
@@ -2,14 +2,152 @@
 Push notification utilities using Expo Push Notifications
 """
 
-from exponent_server_sdk import DeviceNotRegisteredError, PushClient, PushMessage
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+
+from exponent_server_sdk import (
+    DeviceNotRegisteredError,
+    PushClient,
+    PushMessage,
+    PushServerError,
+    PushTicketError,
+)
+from requests.exceptions import RequestException
+
+from app.db import query
+from app.db.connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Expo accepts at most 100 messages per push request
+MAX_BATCH_SIZE = PushClient.DEFAULT_MAX_MESSAGE_COUNT
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0  # seconds, doubled after each failed attempt
+
+
+class PushDispatcher:
+    """
+    Publishes push messages from a background worker thread
+    so request handlers never wait on Expo's API
+    """
+
+    def __init__(
+        self,
+        client: PushClient | None = None,
+        on_device_not_registered: Callable[[list[str]], None] | None = None,
+    ):
+        self._client = client or PushClient()
+        self._on_device_not_registered = on_device_not_registered
+        self._queue: queue.Queue[PushMessage | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="push-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, messages: list[PushMessage]) -> None:
+        """Queue messages for delivery (starts the worker if needed)"""
+        self.start()
+        for message in messages:
+            self._queue.put(message)
+
+    def shutdown(self, timeout: float | None = 30.0) -> None:
+        """Send everything already queued, then stop the worker"""
+        # Holding the lock keeps start() from spawning a second worker that
+        # could take the sentinel meant for this one
+        with self._lock:
+            if self._thread is None:
+                return
+
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+
+            # Drain whatever else is waiting, up to one Expo request worth
+            batch = [message]
+            stop = False
+            while len(batch) < MAX_BATCH_SIZE:
+                try:
+                    message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    stop = True
+                    break
+                batch.append(message)
+
+            self._publish(batch)
+
+            if stop:
+                return
+
+    def _publish(self, messages: list[PushMessage]) -> None:
+        delay = RETRY_BACKOFF
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                tickets = self._client.publish_multiple(messages)
+                break
+            except (PushServerError, RequestException):
+                if attempt == MAX_RETRIES:
+                    logger.exception("Failed to send %d push messages", len(messages))
+                    return
+                time.sleep(delay)
+                delay *= 2
+            except Exception:
+                logger.exception("Failed to send %d push messages", len(messages))
+                return
+
+        self._process_tickets(tickets)
+
+    def _process_tickets(self, tickets) -> None:
+        unregistered_tokens = []
+        for ticket in tickets:
+            try:
+                ticket.validate_response()
+            except DeviceNotRegisteredError:
+                unregistered_tokens.append(ticket.push_message.to)
+            except PushTicketError as e:
+                logger.warning("Push to %s failed: %s", ticket.push_message.to, e)
+
+        if unregistered_tokens and self._on_device_not_registered:
+            try:
+                self._on_device_not_registered(unregistered_tokens)
+            except Exception:
+                logger.exception("Failed to clear unregistered push tokens")
+
+
+def _clear_push_tokens(tokens: list[str]) -> None:
+    db = SessionLocal()
+    try:
+        query.clear_push_tokens(db, tokens)
+    finally:
+        db.close()
+
+
+push_dispatcher = PushDispatcher(on_device_not_registered=_clear_push_tokens)
 
 
 def send_push_notification(
     tokens: list[str], title: str, body: str, data: dict | None = None
 ):
     """
-    Send push notifications to multiple Expo push tokens
+    Queue push notifications to multiple Expo push tokens
+    Delivery happens in the background through `push_dispatcher`
 
     Args:
         tokens: List of Expo push tokens
@@ -41,9 +179,4 @@ def send_push_notification(
         for token in valid_tokens
     ]
 
-    try:
-        PushClient().publish_multiple(messages)
-    except DeviceNotRegisteredError:
-        pass
-    except Exception:
-        pass
+    push_dispatcher.submit(messages)
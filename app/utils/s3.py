@@ -3,15 +3,29 @@ S3 utility functions for media upload/download
 """
 
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from itertools import batched
+from urllib.parse import urlparse
 
 import boto3
+from botocore.config import Config
 from nanoid import generate
 
 from app.utils.config import get_settings
 
 settings = get_settings()
 
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+MAX_UPLOAD_SIZE = 2147483648  # 2GB
+PRESIGNED_URL_EXPIRATION = 3600  # seconds
+
+# Object name within an upload folder: nanoid plus an optional plain extension
+UPLOAD_NAME_PATTERN = re.compile(r"[A-Za-z0-9_-]+(\.[A-Za-z0-9]{1,10})?")
+
 
 class MediaType(str, Enum):
     ORIGINAL = "media"
@@ -19,14 +33,45 @@ class MediaType(str, Enum):
     PROFILE = "profile"
 
 
+def _client_config() -> Config:
+    return Config(
+        # Enough connections for every concurrent HEAD/DELETE worker
+        max_pool_connections=max(
+            settings.s3_max_pool_connections, settings.s3_max_concurrency
+        ),
+        connect_timeout=settings.s3_connect_timeout,
+        read_timeout=settings.s3_read_timeout,
+        retries={
+            "max_attempts": settings.s3_max_attempts,
+            "mode": settings.s3_retry_mode,
+        },
+        tcp_keepalive=settings.s3_tcp_keepalive,
+    )
+
+
 class S3Client:
     def __init__(self):
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=settings.aws_secret_access_key,
-            region_name=settings.aws_region,
-        )
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def s3_client(self):
+        """boto3 client, created on first use and shared by all threads"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = boto3.client(
+                        "s3",
+                        aws_access_key_id=settings.aws_access_key_id,
+                        aws_secret_access_key=settings.aws_secret_access_key,
+                        region_name=settings.aws_region,
+                        config=_client_config(),
+                    )
+        return self._client
+
+    @s3_client.setter
+    def s3_client(self, client) -> None:
+        self._client = client
 
     def generate_presigned_post(
         self,
@@ -34,15 +79,19 @@ class S3Client:
         content_type: str,
         event_s3_key: str,
         media_type: MediaType = MediaType.ORIGINAL,
-        expiration: int = 3600,
+        expiration: int = PRESIGNED_URL_EXPIRATION,
+        max_size: int = MAX_UPLOAD_SIZE,
     ) -> dict | None:
         """
         Generate a presigned POST URL for uploading a file directly to S3
         Files are uploaded with public-read ACL for direct access
         Key format: media/event_s3_key/unique_id.ext
+        Uploads larger than `max_size` bytes are rejected by S3
         """
 
         ext = os.path.splitext(file_name)[1]
+        if not UPLOAD_NAME_PATTERN.fullmatch(f"x{ext}"):
+            ext = ""
         unique_id = generate(size=21)
         key = f"{media_type.value}/{event_s3_key}/{unique_id}{ext}"
 
@@ -57,7 +106,7 @@ class S3Client:
                 Conditions=[
                     {"acl": "public-read"},
                     {"Content-Type": content_type},
-                    ["content-length-range", 1, 2147483648],  # Max 2GB
+                    ["content-length-range", 1, min(max_size, MAX_UPLOAD_SIZE)],
                 ],
                 ExpiresIn=expiration,
             )
@@ -81,6 +130,18 @@ class S3Client:
         except Exception:
             return None
 
+    def get_files_metadata(self, keys: list[str]) -> list[dict | None]:
+        """
+        HEAD several objects concurrently
+        Results are returned in the same order as `keys`
+        """
+        if len(keys) <= 1:
+            return [self.get_file_metadata(key) for key in keys]
+
+        max_workers = min(len(keys), settings.s3_max_concurrency)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.get_file_metadata, keys))
+
     def delete_file(self, key: str) -> bool:
         try:
             self.s3_client.delete_object(Bucket=settings.s3_bucket_name, Key=key)
@@ -88,5 +149,36 @@ class S3Client:
         except Exception:
             return False
 
+    def delete_files(self, keys: list[str]) -> bool:
+        """
+        Delete objects in batches of up to 1000 keys per DeleteObjects call
+        Returns False if any key could not be deleted
+        """
+        success = True
+        for batch in batched(keys, DELETE_BATCH_SIZE):
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=settings.s3_bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+                if response.get("Errors"):
+                    success = False
+            except Exception:
+                success = False
+        return success
+
+
+def is_upload_key(key: str, media_type: MediaType, event_s3_key: str) -> bool:
+    """Whether `key` has the form generate_presigned_post uses for the event"""
+    prefix = f"{media_type.value}/{event_s3_key}/"
+    return key.startswith(prefix) and bool(
+        UPLOAD_NAME_PATTERN.fullmatch(key.removeprefix(prefix))
+    )
+
+
+def get_key_from_url(url: str) -> str:
+    """Object key of a public URL like https://bucket.s3.region.amazonaws.com/key"""
+    return urlparse(url).path.lstrip("/")
+
 
 s3_client = S3Client()
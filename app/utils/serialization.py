@@ -0,0 +1,39 @@
+"""
+Response building helpers for list endpoints
+
+Rows read from the DB are already valid, so with `fast_serialization` the
+response models are constructed without validation and dumped to JSON once
+here, instead of being re-validated through FastAPI's response_model.
+"""
+
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.utils.config import get_settings
+
+
+def build_model[T: BaseModel](model: type[T], **fields: Any) -> T:
+    if get_settings().fast_serialization:
+        return model.model_construct(**fields)
+    return model(**fields)
+
+
+def json_response(content: bytes, headers: dict[str, str]) -> Response:
+    """Response for JSON that is already serialized"""
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def serialize_response(
+    response: Response, value: Any, adapter: TypeAdapter, headers: dict[str, str]
+) -> Any:
+    """
+    Return `value` for response_model to serialize, or with
+    `fast_serialization` dump it through `adapter` directly
+    """
+    if get_settings().fast_serialization:
+        return json_response(adapter.dump_json(value), headers)
+
+    response.headers.update(headers)
+    return value
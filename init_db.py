@@ -2,25 +2,18 @@
 Database initialization script
 """
 
-from sqlalchemy import create_engine
-
-from app.db.models import Base
+from app.db.connection import create_db_engine
+from app.db.migrations import run_migrations
 from app.utils.config import get_settings
 
-settings = get_settings()
-
 
 def init_database():
-    """Initialize database tables only"""
-
-    # Create engine
-    engine = create_engine(
-        settings.database_url, connect_args={"check_same_thread": False}
-    )
-
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created successfully")
+    """Create missing tables and bring existing ones up to date"""
+    # Backfills may outlast the per-request statement timeout
+    engine = create_db_engine(get_settings().database_url, statement_timeout=0)
+    run_migrations(engine)
+    engine.dispose()
+    print("✅ Database tables created and migrated successfully")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+"""
+Admin 화면 훅 테스트
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.admin import EventAdmin, MediaAdmin, UserAdmin
+from app.db.models import Event, Media, Team
+
+
+@pytest.fixture
+def admin_session(test_db, monkeypatch):
+    """admin 뷰와 훅이 테스트 DB 연결을 쓰도록 설정"""
+    session_maker = sessionmaker(bind=test_db.get_bind(), autoflush=False)
+    monkeypatch.setattr("app.admin.SessionLocal", session_maker)
+    return session_maker
+
+
+def _view(view_class, session_maker):
+    view = view_class()
+    view.session_maker = session_maker
+    view.is_async = False
+    return view
+
+
+def _request():
+    return Request({"type": "http", "method": "POST", "headers": []})
+
+
+@pytest.fixture
+def other_team(test_db):
+    team = Team(name="Other Team", storage_limit=1048576, storage_used=0)
+    test_db.add(team)
+    test_db.commit()
+    return team
+
+
+@pytest.mark.api
+class TestAdminHooks:
+    """admin에서 직접 수정해도 Media.team_id가 이벤트의 팀을 따르는지 확인"""
+
+    async def test_create_media_takes_event_team(
+        self, admin_session, test_db, sample_event, sample_user
+    ):
+        """미디어 생성 시 이벤트의 팀을 team_id로 설정"""
+        view = _view(MediaAdmin, admin_session)
+        await view.insert_model(
+            _request(),
+            {
+                "event": str(sample_event.id),
+                "user": str(sample_user.id),
+                "url": "https://test.s3.amazonaws.com/admin.jpg",
+                "thumb_url": "https://test.s3.amazonaws.com/admin_thumb.jpg",
+                "file_type": "image/jpeg",
+                "file_size": 1024,
+                "created_at": datetime.now(),
+            },
+        )
+
+        media = test_db.query(Media).one()
+        assert media.team_id == sample_event.team_id
+
+    async def test_event_team_change_moves_media(
+        self, admin_session, test_db, sample_event, sample_media, other_team
+    ):
+        """이벤트의 팀을 바꾸면 미디어와 사용량도 옮겨감"""
+        team_id = sample_event.team_id
+        view = _view(EventAdmin, admin_session)
+        await view.update_model(
+            _request(), str(sample_event.id), {"team": str(other_team.id)}
+        )
+
+        test_db.expire_all()
+        assert test_db.get(Media, sample_media.id).team_id == other_team.id
+        assert test_db.get(Team, team_id).storage_used == 0
+        assert test_db.get(Team, other_team.id).storage_used == 1
+
+    async def test_media_moved_to_other_team_event(
+        self, admin_session, test_db, sample_media, other_team
+    ):
+        """다른 팀의 이벤트로 옮긴 미디어는 그 팀으로 이동"""
+        other_event = Event(
+            title="Other", date=datetime(2025, 10, 22), team_id=other_team.id
+        )
+        test_db.add(other_event)
+        test_db.commit()
+
+        view = _view(MediaAdmin, admin_session)
+        await view.update_model(
+            _request(), str(sample_media.id), {"event": str(other_event.id)}
+        )
+
+        test_db.expire_all()
+        assert test_db.get(Media, sample_media.id).team_id == other_team.id
+
+    async def test_media_moved_refreshes_both_previews(
+        self, admin_session, test_db, sample_event, sample_media
+    ):
+        """다른 이벤트로 옮기면 이전 이벤트의 미리보기도 갱신"""
+        from app.db import query
+
+        query.refresh_event_preview(test_db, sample_event.id)
+        new_event = Event(
+            title="New", date=datetime(2025, 10, 23), team_id=sample_event.team_id
+        )
+        test_db.add(new_event)
+        test_db.commit()
+
+        view = _view(MediaAdmin, admin_session)
+        await view.update_model(
+            _request(), str(sample_media.id), {"event": str(new_event.id)}
+        )
+
+        test_db.expire_all()
+        old_event = test_db.get(Event, sample_event.id)
+        assert (old_event.media_count, old_event.thumbnails) == (0, [])
+        new_event = test_db.get(Event, new_event.id)
+        assert new_event.media_count == 1
+        assert new_event.thumbnails == [sample_media.thumb_url]
+
+    async def test_event_edit_invalidates_event_list(
+        self, admin_session, client, test_db, auth_headers, sample_event
+    ):
+        """admin에서 이벤트를 수정하면 이전 ETag로 304가 나오지 않음"""
+        etag = client.get("/api/events", headers=auth_headers).headers["ETag"]
+
+        view = _view(EventAdmin, admin_session)
+        await view.update_model(_request(), str(sample_event.id), {"title": "Renamed"})
+
+        test_db.expire_all()
+        response = client.get(
+            "/api/events", headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()[0]["title"] == "Renamed"
+
+    async def test_event_delete_bumps_team_version(
+        self, admin_session, test_db, sample_event
+    ):
+        """admin에서 이벤트를 삭제해도 팀 버전이 올라감"""
+        team_id = sample_event.team_id
+        version = test_db.get(Team, team_id).version
+
+        view = _view(EventAdmin, admin_session)
+        await view.delete_model(_request(), str(sample_event.id))
+
+        test_db.expire_all()
+        assert test_db.get(Team, team_id).version == version + 1
+
+    async def test_user_rename_invalidates_feed(
+        self, admin_session, client, test_db, auth_headers, sample_user, sample_media
+    ):
+        """admin에서 사용자 이름을 바꾸면 피드의 ETag와 캐시도 갱신"""
+        etag = client.get("/api/media", headers=auth_headers).headers["ETag"]
+
+        view = _view(UserAdmin, admin_session)
+        await view.update_model(_request(), str(sample_user.id), {"name": "Renamed"})
+
+        test_db.expire_all()
+        response = client.get(
+            "/api/media", headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["items"][0]["user"]["name"] == "Renamed"
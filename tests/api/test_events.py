@@ -24,6 +24,81 @@ class TestEventsAPI:
         assert data[0]["location"] == "Test Location"
         assert data[0]["tags"] == ["test", "event"]
 
+    def test_get_events_fast_serialization(
+        self, client, sample_user, sample_event, monkeypatch
+    ):
+        """fast_serialization 설정 시에도 같은 응답"""
+        from app.utils.config import get_settings
+
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+        expected = client.get("/api/events", headers=headers).json()
+
+        monkeypatch.setattr(get_settings(), "fast_serialization", True)
+        response = client.get("/api/events", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["ETag"]
+        assert response.json() == expected
+
+    def test_get_events_paginated(self, client, test_db, sample_team, sample_user):
+        """limit/cursor 및 from/to 파라미터로 이벤트 조회"""
+        from datetime import datetime
+
+        from app.db.models import Event
+
+        for day in range(1, 6):
+            test_db.add(
+                Event(
+                    title=f"Day {day}",
+                    date=datetime(2025, 10, day),
+                    team_id=sample_team.id,
+                )
+            )
+        test_db.commit()
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+
+        response = client.get(
+            "/api/events",
+            params={"limit": 2, "from": "2025-10-02T00:00:00"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert [e["title"] for e in response.json()] == ["Day 5", "Day 4"]
+        cursor = response.headers["X-Next-Cursor"]
+
+        response = client.get(
+            "/api/events",
+            params={"limit": 2, "from": "2025-10-02T00:00:00", "cursor": cursor},
+            headers=headers,
+        )
+        assert [e["title"] for e in response.json()] == ["Day 3", "Day 2"]
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_get_events_not_modified(self, client, sample_user, sample_event):
+        """변경이 없으면 304, 이벤트 수정 후에는 200"""
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+        etag = client.get("/api/events", headers=headers).headers["ETag"]
+
+        response = client.get("/api/events", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        client.put(
+            f"/api/events/{sample_event.id}", json={"title": "Renamed"}, headers=headers
+        )
+
+        response = client.get("/api/events", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()[0]["title"] == "Renamed"
+
+    def test_get_events_by_tag(self, client, sample_user, sample_event):
+        """tag 파라미터로 이벤트 필터링"""
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+
+        response = client.get("/api/events", params={"tag": "test"}, headers=headers)
+        assert [e["id"] for e in response.json()] == [sample_event.id]
+
+        response = client.get("/api/events", params={"tag": "nope"}, headers=headers)
+        assert response.json() == []
+
     def test_get_events_unauthorized(self, client):
         """인증 없이 이벤트 조회 시 실패"""
         response = client.get("/api/events")
@@ -71,6 +146,15 @@ class TestEventsAPI:
         )
         assert response.status_code == 422
 
+    def test_create_event_tag_too_long(self, client, sample_user):
+        """event_tags 컬럼보다 긴 태그는 422"""
+        response = client.post(
+            "/api/events",
+            json={"title": "Event", "date": "2025-10-22T10:00:00", "tags": ["a" * 101]},
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 422
+
     def test_delete_event_success(self, client, sample_user, sample_event):
         """이벤트 삭제 성공 (미디어 없음)"""
         response = client.delete(
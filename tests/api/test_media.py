@@ -84,6 +84,118 @@ class TestMediaAPI:
         )
         assert response.status_code == 403
 
+    @patch("app.utils.s3.s3_client.generate_presigned_post")
+    def test_get_presigned_upload_url_reserves_storage(
+        self, mock_presigned, client, sample_user, sample_event, test_db
+    ):
+        """파일 크기를 보내면 용량을 예약하고, 남은 용량을 넘으면 실패"""
+        from app.db.models import StorageReservation, Team
+
+        team = test_db.query(Team).filter_by(id=sample_user.team_id).first()
+        team.storage_used = team.storage_limit - 4
+        test_db.commit()
+        mock_presigned.side_effect = lambda **kwargs: {
+            "url": "https://s3.amazonaws.com/test-bucket",
+            "fields": {},
+            "key": f"{kwargs['media_type'].value}/test.jpg",
+        }
+
+        def request_url():
+            return client.post(
+                "/api/media/presigned-url",
+                json={
+                    "event_id": sample_event.id,
+                    "file_name": "test.jpg",
+                    "content_type": "image/jpeg",
+                    "file_size": 3 * 1024,
+                },
+                headers={"Authorization": f"Bearer {sample_user.api_key}"},
+            )
+
+        assert request_url().status_code == 200
+        assert mock_presigned.call_args_list[0].kwargs["max_size"] == 3 * 1024
+        assert test_db.query(StorageReservation).count() == 1
+
+        # 예약된 3KB 때문에 남은 1KB로는 부족함
+        assert request_url().status_code == 403
+
+    @patch("app.utils.s3.s3_client.generate_presigned_post")
+    def test_get_presigned_upload_urls_batch(
+        self, mock_presigned, client, sample_user, sample_event
+    ):
+        """여러 파일의 presigned URL을 한 번에 생성"""
+        mock_presigned.side_effect = lambda **kwargs: {
+            "url": "https://s3.amazonaws.com/test-bucket",
+            "fields": {},
+            "key": f"{kwargs['media_type'].value}/{kwargs['file_name']}",
+        }
+
+        response = client.post(
+            "/api/media/presigned-urls",
+            json={
+                "event_id": sample_event.id,
+                "files": [
+                    {"file_name": f"{i}.jpg", "content_type": "image/jpeg"}
+                    for i in range(3)
+                ],
+            },
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [item["original"]["key"] for item in items] == [
+            "media/0.jpg",
+            "media/1.jpg",
+            "media/2.jpg",
+        ]
+        assert items[0]["thumbnail"]["key"] == "media/thumb/0.jpg"
+
+    @patch("app.utils.s3.s3_client.generate_presigned_post")
+    def test_get_presigned_upload_urls_storage_limit_exceeded(
+        self, mock_presigned, client, sample_user, sample_event, test_db
+    ):
+        """파일 크기 합계가 남은 용량을 넘으면 아무것도 예약하지 않음"""
+        from app.db.models import StorageReservation, Team
+
+        team = test_db.query(Team).filter_by(id=sample_user.team_id).first()
+        team.storage_used = team.storage_limit - 4
+        test_db.commit()
+        mock_presigned.side_effect = lambda **kwargs: {
+            "url": "https://s3.amazonaws.com/test-bucket",
+            "fields": {},
+            "key": f"{kwargs['media_type'].value}/{kwargs['file_name']}",
+        }
+
+        response = client.post(
+            "/api/media/presigned-urls",
+            json={
+                "event_id": sample_event.id,
+                "files": [
+                    {
+                        "file_name": f"{i}.jpg",
+                        "content_type": "image/jpeg",
+                        "file_size": 3 * 1024,
+                    }
+                    for i in range(2)
+                ],
+            },
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 403
+        assert test_db.query(StorageReservation).count() == 0
+
+    def test_get_presigned_upload_urls_event_not_found(self, client, sample_user):
+        """존재하지 않는 이벤트에 대한 일괄 요청 시 실패"""
+        response = client.post(
+            "/api/media/presigned-urls",
+            json={
+                "event_id": 99999,
+                "files": [{"file_name": "test.jpg", "content_type": "image/jpeg"}],
+            },
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 404
+
     @patch("app.utils.s3.s3_client.get_file_metadata")
     @patch("app.routers.media.send_push_notification")
     def test_create_media_success(
@@ -101,8 +213,8 @@ class TestMediaAPI:
                 "media_list": [
                     {
                         "event_id": sample_event.id,
-                        "s3_key": "original/test.jpg",
-                        "thumb_s3_key": "thumb/test.jpg",
+                        "s3_key": f"media/{sample_event.s3_key}/test.jpg",
+                        "thumb_s3_key": f"media/thumb/{sample_event.s3_key}/test.jpg",
                         "file_metadata": {"width": 1920, "height": 1080},
                     }
                 ]
@@ -122,6 +234,117 @@ class TestMediaAPI:
         # 푸시 알림이 호출되었는지 확인
         assert mock_push.called
 
+    @patch("app.utils.s3.s3_client.get_file_metadata")
+    def test_create_media_other_team_event(
+        self, mock_metadata, client, sample_user, test_db
+    ):
+        """다른 팀의 이벤트에는 미디어를 추가할 수 없음"""
+        from app.db.models import Event, Media, Team
+
+        other_team = Team(name="Other Team", storage_limit=1048576, storage_used=0)
+        test_db.add(other_team)
+        test_db.flush()
+        other_event = Event(
+            title="Other", date=datetime(2025, 10, 22), team_id=other_team.id
+        )
+        test_db.add(other_event)
+        test_db.commit()
+
+        response = client.post(
+            "/api/media",
+            json={
+                "media_list": [
+                    {
+                        "event_id": other_event.id,
+                        "s3_key": "original/test.jpg",
+                        "thumb_s3_key": "thumb/test.jpg",
+                    }
+                ]
+            },
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 404
+        assert test_db.query(Media).count() == 0
+        mock_metadata.assert_not_called()
+
+    @patch("app.utils.s3.s3_client.get_file_metadata")
+    def test_create_media_invalid_key(
+        self, mock_metadata, client, sample_user, sample_event, sample_media
+    ):
+        """이벤트용으로 발급된 형식이 아닌 키는 거부"""
+        response = client.post(
+            "/api/media",
+            json={
+                "media_list": [
+                    {
+                        "event_id": sample_event.id,
+                        "s3_key": sample_media.s3_key,
+                        "thumb_s3_key": sample_media.thumb_s3_key,
+                    }
+                ]
+            },
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 400
+        mock_metadata.assert_not_called()
+
+    @patch("app.utils.s3.s3_client.get_file_metadata")
+    @patch("app.routers.media.send_push_notification")
+    def test_create_media_already_confirmed(
+        self, mock_push, mock_metadata, client, sample_user, sample_event, test_db
+    ):
+        """같은 키로 다시 확정하면 중복 생성하지 않음"""
+        from app.db.models import Media
+
+        mock_metadata.return_value = {"size": 1024, "content_type": "image/jpeg"}
+        payload = {
+            "media_list": [
+                {
+                    "event_id": sample_event.id,
+                    "s3_key": f"media/{sample_event.s3_key}/retry.jpg",
+                    "thumb_s3_key": f"media/thumb/{sample_event.s3_key}/retry.jpg",
+                }
+            ]
+        }
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+
+        assert (
+            client.post("/api/media", json=payload, headers=headers).status_code == 204
+        )
+        assert (
+            client.post("/api/media", json=payload, headers=headers).status_code == 409
+        )
+        assert test_db.query(Media).count() == 1
+
+    # The failed insert rolls back the fixture's outer transaction
+    @pytest.mark.filterwarnings("ignore:transaction already deassociated")
+    @patch("app.utils.s3.s3_client.get_file_metadata")
+    @patch("app.routers.media.send_push_notification")
+    def test_create_media_concurrent_confirm(
+        self, mock_push, mock_metadata, client, sample_user, sample_event
+    ):
+        """동시 확정이 중복 검사를 함께 통과해도 409"""
+        mock_metadata.return_value = {"size": 1024, "content_type": "image/jpeg"}
+        payload = {
+            "media_list": [
+                {
+                    "event_id": sample_event.id,
+                    "s3_key": f"media/{sample_event.s3_key}/race.jpg",
+                    "thumb_s3_key": f"media/thumb/{sample_event.s3_key}/race.jpg",
+                }
+            ]
+        }
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+
+        assert (
+            client.post("/api/media", json=payload, headers=headers).status_code == 204
+        )
+        # The second request checked before the first one committed
+        with patch("app.db.query.referenced_keys", return_value=set()):
+            response = client.post("/api/media", json=payload, headers=headers)
+
+        assert response.status_code == 409
+
     @patch("app.utils.s3.s3_client.get_file_metadata")
     def test_create_media_file_not_found(
         self, mock_metadata, client, sample_user, sample_event
@@ -135,14 +358,75 @@ class TestMediaAPI:
                 "media_list": [
                     {
                         "event_id": sample_event.id,
-                        "s3_key": "nonexistent.jpg",
-                        "thumb_s3_key": "nonexistent_thumb.jpg",
+                        "s3_key": f"media/{sample_event.s3_key}/none.jpg",
+                        "thumb_s3_key": f"media/thumb/{sample_event.s3_key}/none.jpg",
+                    }
+                ]
+            },
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 400
+
+    @patch("app.utils.s3.s3_client.get_file_metadata")
+    @patch("app.routers.media.send_push_notification")
+    def test_create_media_batch(
+        self, mock_push, mock_metadata, client, sample_user, sample_event, test_db
+    ):
+        """여러 미디어 일괄 생성 (S3 메타데이터 병렬 조회)"""
+        mock_metadata.return_value = {"size": 2048, "content_type": "image/jpeg"}
+
+        response = client.post(
+            "/api/media",
+            json={
+                "media_list": [
+                    {
+                        "event_id": sample_event.id,
+                        "s3_key": f"media/{sample_event.s3_key}/{i}.jpg",
+                        "thumb_s3_key": f"media/thumb/{sample_event.s3_key}/{i}.jpg",
+                    }
+                    for i in range(20)
+                ]
+            },
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 204
+        assert mock_metadata.call_count == 40  # 원본과 썸네일
+
+        from app.db.models import Media
+
+        assert test_db.query(Media).filter_by(event_id=sample_event.id).count() == 20
+
+    @patch("app.utils.s3.s3_client.get_file_metadata")
+    def test_create_media_batch_partial_not_found(
+        self, mock_metadata, client, sample_user, sample_event, test_db
+    ):
+        """일부 파일이 S3에 없으면 전체 실패"""
+        mock_metadata.side_effect = lambda key: (
+            None
+            if key.endswith("/missing.jpg")
+            else {"size": 1024, "content_type": "image/jpeg"}
+        )
+
+        response = client.post(
+            "/api/media",
+            json={
+                "media_list": [
+                    {
+                        "event_id": sample_event.id,
+                        "s3_key": f"media/{sample_event.s3_key}/{name}",
+                        "thumb_s3_key": f"media/thumb/{sample_event.s3_key}/{name}",
                     }
+                    for name in ["a.jpg", "missing.jpg"]
                 ]
             },
             headers={"Authorization": f"Bearer {sample_user.api_key}"},
         )
         assert response.status_code == 400
+        assert f"media/{sample_event.s3_key}/missing.jpg" in response.json()["detail"]
+
+        from app.db.models import Media
+
+        assert test_db.query(Media).count() == 0
 
     @patch("app.utils.s3.s3_client.get_file_metadata")
     def test_create_media_storage_limit_exceeded(
@@ -161,8 +445,8 @@ class TestMediaAPI:
                 "media_list": [
                     {
                         "event_id": sample_event.id,
-                        "s3_key": "original/huge.jpg",
-                        "thumb_s3_key": "thumb/huge.jpg",
+                        "s3_key": f"media/{sample_event.s3_key}/huge.jpg",
+                        "thumb_s3_key": f"media/thumb/{sample_event.s3_key}/huge.jpg",
                     }
                 ]
             },
@@ -184,6 +468,23 @@ class TestMediaAPI:
         assert len(data["items"]) == 1
         assert data["items"][0]["id"] == sample_media.id
 
+    def test_get_media_feed_fast_serialization(
+        self, client, sample_user, sample_media, monkeypatch
+    ):
+        """fast_serialization 설정 시에도 같은 응답"""
+        from app.utils.cache import feed_cache
+        from app.utils.config import get_settings
+
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+        expected = client.get("/api/media", headers=headers).json()
+        feed_cache.clear()
+
+        monkeypatch.setattr(get_settings(), "fast_serialization", True)
+        response = client.get("/api/media", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["ETag"]
+        assert response.json() == expected
+
     def test_get_media_feed_with_cursor(
         self, client, sample_user, test_db, sample_event
     ):
@@ -195,6 +496,7 @@ class TestMediaAPI:
             media = Media(
                 event_id=sample_event.id,
                 user_id=sample_user.id,
+                team_id=sample_event.team_id,
                 url=f"https://test.s3.amazonaws.com/test{i}.jpg",
                 thumb_url=f"https://test.s3.amazonaws.com/test{i}_thumb.jpg",
                 file_type="image/jpeg",
@@ -212,7 +514,73 @@ class TestMediaAPI:
         data = response.json()
         assert len(data["items"]) == 5
 
-    def test_delete_media_success(self, client, sample_user, sample_media):
+    @patch("app.utils.s3.s3_client.get_file_metadata")
+    @patch("app.routers.media.send_push_notification")
+    def test_get_media_feed_not_modified(
+        self, mock_push, mock_metadata, client, sample_user, sample_event
+    ):
+        """변경이 없으면 304, 미디어 추가 후에는 200"""
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+        response = client.get("/api/media", headers=headers)
+        etag = response.headers["ETag"]
+
+        response = client.get("/api/media", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        mock_metadata.return_value = {"size": 1024, "content_type": "image/jpeg"}
+        client.post(
+            "/api/media",
+            json={
+                "media_list": [
+                    {
+                        "event_id": sample_event.id,
+                        "s3_key": f"media/{sample_event.s3_key}/test.jpg",
+                        "thumb_s3_key": f"media/thumb/{sample_event.s3_key}/test.jpg",
+                    }
+                ]
+            },
+            headers=headers,
+        )
+
+        response = client.get("/api/media", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert len(response.json()["items"]) == 1
+
+    def test_get_media_feed_first_page_cached(
+        self, client, test_db, sample_user, sample_media, sample_team
+    ):
+        """첫 페이지 캐시 적중 및 미디어 삭제 시 무효화"""
+        from app.db import query
+        from app.utils.cache import feed_cache
+
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+        hits = feed_cache.hits
+
+        first = client.get("/api/media", headers=headers).json()
+        second = client.get("/api/media", headers=headers).json()
+        assert first == second
+        assert feed_cache.hits == hits + 1
+        # 직렬화된 JSON을 그대로 캐시
+        assert isinstance(feed_cache.get(sample_team.id)[1], bytes)
+
+        query.delete_media(test_db, sample_media, sample_team.id)
+        assert feed_cache.get(sample_team.id) is None
+
+        response = client.get("/api/media", headers=headers)
+        assert response.json()["items"] == []
+
+    def test_get_media_feed_invalid_cursor(self, client, sample_user):
+        """잘못된 커서로 피드 조회 시 실패"""
+        response = client.get(
+            "/api/media",
+            params={"cursor": "not-a-cursor"},
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 400
+
+    @patch("app.utils.s3.s3_client.delete_files")
+    def test_delete_media_success(self, mock_delete, client, sample_user, sample_media):
         """미디어 삭제 성공"""
         response = client.delete(
             f"/api/media/{sample_media.id}",
@@ -220,6 +588,150 @@ class TestMediaAPI:
         )
         assert response.status_code == 204
 
+        # 원본과 썸네일 S3 객체 삭제
+        mock_delete.assert_called_once_with(["test.jpg", "test_thumb.jpg"])
+
+    @patch("app.utils.s3.s3_client.delete_files")
+    def test_delete_media_list_success(
+        self, mock_delete, client, test_db, sample_user, sample_event, sample_team
+    ):
+        """여러 미디어 일괄 삭제 성공"""
+        from app.db import query
+        from app.db.models import Media
+
+        query.create_media_bulk(
+            db=test_db,
+            user_id=sample_user.id,
+            media_data_list=[
+                {
+                    "event_id": sample_event.id,
+                    "url": f"https://test.s3.amazonaws.com/media/{i}.jpg",
+                    "thumb_url": f"https://test.s3.amazonaws.com/media/thumb/{i}.jpg",
+                    "s3_key": f"media/{i}.jpg",
+                    "thumb_s3_key": f"media/thumb/{i}.jpg",
+                    "file_type": "image/jpeg",
+                    "file_size": 1024,
+                    "created_at": datetime.now(),
+                }
+                for i in range(3)
+            ],
+            team_id=sample_team.id,
+        )
+        media_ids = [m.id for m in test_db.query(Media).order_by(Media.id)]
+
+        response = client.post(
+            "/api/media/delete",
+            json={"media_ids": media_ids[:2]},
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 204
+
+        assert [m.id for m in test_db.query(Media)] == media_ids[2:]
+        test_db.refresh(sample_team)
+        assert sample_team.storage_used == 1
+        test_db.refresh(sample_event)
+        assert sample_event.media_count == 1
+        assert sample_event.thumbnails == [
+            "https://test.s3.amazonaws.com/media/thumb/2.jpg"
+        ]
+
+        keys = mock_delete.call_args.args[0]
+        assert sorted(keys) == [
+            "media/0.jpg",
+            "media/1.jpg",
+            "media/thumb/0.jpg",
+            "media/thumb/1.jpg",
+        ]
+
+    @patch("app.utils.s3.s3_client.delete_files")
+    def test_delete_media_keeps_shared_objects(
+        self, mock_delete, client, test_db, sample_user, sample_media
+    ):
+        """여러 미디어가 공유하는 기존 S3 객체는 삭제하지 않음"""
+        from app.db.models import Media
+
+        # Migrations leave no key on objects shared by several rows
+        sample_media.thumb_s3_key = None
+        other = Media(
+            event_id=sample_media.event_id,
+            user_id=sample_media.user_id,
+            team_id=sample_media.team_id,
+            url="https://test.s3.amazonaws.com/other.jpg",
+            thumb_url=sample_media.thumb_url,
+            s3_key="other.jpg",
+            thumb_s3_key=None,
+            file_type="image/jpeg",
+            file_size=1024,
+            created_at=datetime.now(),
+        )
+        test_db.add(other)
+        test_db.commit()
+
+        response = client.delete(
+            f"/api/media/{sample_media.id}",
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 204
+        mock_delete.assert_called_once_with(["test.jpg"])
+
+    @patch("app.utils.s3.s3_client.delete_files")
+    def test_delete_media_list_concurrently_deleted(
+        self, mock_delete, client, sample_user, sample_media
+    ):
+        """검사 이후 다른 요청이 먼저 지운 미디어가 있으면 404"""
+        from app.db import query
+
+        with patch(
+            "app.db.query.delete_media_bulk",
+            side_effect=query.MediaNotFoundError(sample_media.team_id),
+        ):
+            response = client.post(
+                "/api/media/delete",
+                json={"media_ids": [sample_media.id]},
+                headers={"Authorization": f"Bearer {sample_user.api_key}"},
+            )
+
+        assert response.status_code == 404
+        mock_delete.assert_not_called()
+
+    @patch("app.utils.s3.s3_client.delete_files")
+    def test_delete_media_list_not_found(
+        self, mock_delete, client, test_db, sample_user, sample_media
+    ):
+        """존재하지 않는 미디어가 포함되면 아무것도 삭제하지 않음"""
+        response = client.post(
+            "/api/media/delete",
+            json={"media_ids": [sample_media.id, 99999]},
+            headers={"Authorization": f"Bearer {sample_user.api_key}"},
+        )
+        assert response.status_code == 404
+
+        from app.db.models import Media
+
+        assert test_db.query(Media).count() == 1
+        assert not mock_delete.called
+
+    @patch("app.utils.s3.s3_client.delete_files")
+    def test_delete_media_list_unauthorized(
+        self, mock_delete, client, test_db, sample_team, sample_media
+    ):
+        """다른 사용자의 미디어가 포함되면 실패"""
+        from app.db.models import User
+
+        other_user = User(
+            name="Other User", api_key="other_api_key", team_id=sample_team.id
+        )
+        test_db.add(other_user)
+        test_db.commit()
+
+        response = client.post(
+            "/api/media/delete",
+            json={"media_ids": [sample_media.id]},
+            headers={"Authorization": f"Bearer {other_user.api_key}"},
+        )
+        assert response.status_code == 403
+        assert not mock_delete.called
+
     def test_delete_media_not_found(self, client, sample_user):
         """존재하지 않는 미디어 삭제 시 실패"""
         response = client.delete(
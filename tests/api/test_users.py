@@ -55,6 +55,69 @@ class TestUsersAPI:
         assert "Friend 1" in friend_names
         assert "Friend 2" in friend_names
 
+    def test_get_me_friend_profile_updated(
+        self, client, test_db, sample_user, sample_team
+    ):
+        """친구가 프로필 이미지를 바꾸면 캐시된 명단에도 반영"""
+        from app.db.models import User
+
+        friend = User(name="Friend", api_key="friend_key", team_id=sample_team.id)
+        test_db.add(friend)
+        test_db.commit()
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+
+        response = client.get("/api/users/me", headers=headers)
+        assert response.json()["friends"][0]["profile_img"] is None
+
+        new_url = "https://s3.amazonaws.com/bucket/profile/2/new.jpg"
+        client.put(
+            "/api/users/profile-image",
+            json={"url": new_url},
+            headers={"Authorization": "Bearer friend_key"},
+        )
+
+        response = client.get("/api/users/me", headers=headers)
+        assert response.json()["friends"][0]["profile_img"] == new_url
+
+    def test_get_me_fills_roster_cache(self, client, sample_user, sample_team):
+        """읽기 엔진이 primary면 /users/me가 명단 캐시를 채움"""
+        from app.utils.cache import roster_cache
+
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+        client.get("/api/users/me", headers=headers)
+
+        assert [m.id for m in roster_cache.get(sample_team.id)] == [sample_user.id]
+
+    def test_get_me_replica_skips_roster_cache(
+        self, client, sample_user, sample_team, monkeypatch
+    ):
+        """별도 replica에서 읽은 명단은 캐시하지 않음"""
+        from app.utils.cache import roster_cache
+
+        monkeypatch.setattr("app.db.connection.read_engine", object())
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+        client.get("/api/users/me", headers=headers)
+
+        assert roster_cache.get(sample_team.id) is None
+
+    def test_auth_cache_skips_fill_invalidated_during_lookup(self, client, sample_user):
+        """API 키 조회 중 사용자 캐시가 무효화되면 조회 결과를 캐시하지 않음"""
+        from app.db import query
+        from app.utils.cache import user_cache
+
+        get_user = query.get_user
+
+        def get_user_then_invalidate(*args, **kwargs):
+            user = get_user(*args, **kwargs)
+            user_cache.delete(sample_user.api_key)
+            return user
+
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+        with patch("app.db.query.get_user", side_effect=get_user_then_invalidate):
+            assert client.get("/api/users/me", headers=headers).status_code == 200
+
+        assert user_cache.get(sample_user.api_key) is None
+
     def test_get_me_unauthorized(self, client):
         """인증 없이 사용자 정보 조회 시 실패"""
         response = client.get("/api/users/me")
@@ -134,6 +197,18 @@ class TestUsersAPI:
         test_db.refresh(sample_user)
         assert sample_user.profile_img == new_url
 
+    def test_update_profile_image_invalidates_auth_cache(self, client, sample_user):
+        """프로필 이미지 변경 후 캐시된 인증 정보가 갱신되는지 확인"""
+        headers = {"Authorization": f"Bearer {sample_user.api_key}"}
+        response = client.get("/api/users/me", headers=headers)
+        assert response.json()["profile_img"] is None
+
+        new_url = "https://s3.amazonaws.com/bucket/profile/1/new.jpg"
+        client.put("/api/users/profile-image", json={"url": new_url}, headers=headers)
+
+        response = client.get("/api/users/me", headers=headers)
+        assert response.json()["profile_img"] == new_url
+
     def test_update_profile_image_unauthorized(self, client):
         """인증 없이 프로필 이미지 업데이트 시 실패"""
         response = client.put(
@@ -52,7 +52,8 @@ def test_db(test_engine):
 @pytest.fixture(scope="function")
 def client(test_engine, test_db):
     """FastAPI TestClient 생성 (test_db와 같은 엔진 공유)"""
-    from app.middlewares.db import _get_db
+    from app.middlewares.db import _get_db, _get_read_db
+    from app.utils.cache import feed_cache, roster_cache, user_cache
 
     # DB 세션을 테스트용으로 오버라이드
     # test_db와 같은 세션을 반환하도록 수정
@@ -64,11 +65,20 @@ def client(test_engine, test_db):
 
     # DB dependency 오버라이드
     app.dependency_overrides[_get_db] = override_get_db
+    app.dependency_overrides[_get_read_db] = override_get_db
+
+    # 테스트 간 캐시 공유 방지
+    user_cache.clear()
+    feed_cache.clear()
+    roster_cache.clear()
 
     with TestClient(app) as test_client:
         yield test_client
 
     app.dependency_overrides.clear()
+    user_cache.clear()
+    feed_cache.clear()
+    roster_cache.clear()
 
 
 # 테스트 데이터 픽스처
@@ -109,7 +119,7 @@ def sample_event(test_db, sample_team):
         description="Test Description",
         date=datetime(2025, 10, 22, 10, 0, 0),
         location="Test Location",
-        tags="test,event",
+        tags=["test", "event"],
         team_id=sample_team.id,
     )
     test_db.add(event)
@@ -126,8 +136,11 @@ def sample_media(test_db, sample_event, sample_user, sample_team):
     media = Media(
         event_id=sample_event.id,
         user_id=sample_user.id,
+        team_id=sample_event.team_id,
         url="https://test.s3.amazonaws.com/test.jpg",
         thumb_url="https://test.s3.amazonaws.com/test_thumb.jpg",
+        s3_key="test.jpg",
+        thumb_s3_key="test_thumb.jpg",
         file_type="image/jpeg",
         file_size=1024,
         created_at=datetime.now(),
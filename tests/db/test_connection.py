@@ -0,0 +1,76 @@
+"""
+DB 연결 설정 테스트
+"""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.db.connection import configure_sqlite, create_db_engine
+
+
+@pytest.mark.db
+class TestSQLitePragmas:
+    """SQLite pragma 적용 테스트"""
+
+    def test_pragmas_applied_on_connect(self, tmp_path):
+        """새 연결마다 설정된 pragma 적용"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        configure_sqlite(engine)
+
+        with engine.connect() as conn:
+
+            def pragma(name):
+                return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") == 5000
+            assert pragma("cache_size") == -64000
+            assert pragma("temp_store") == 2  # MEMORY
+
+        engine.dispose()
+
+    def test_read_only_engine_rejects_writes(self, tmp_path):
+        """읽기 전용 엔진은 쓰기를 거부하고 journal mode를 바꾸지 않음"""
+        path = tmp_path / "test.db"
+        with create_engine(f"sqlite:///{path}").begin() as conn:
+            conn.execute(text("CREATE TABLE t (id INTEGER)"))
+
+        engine = create_engine(f"sqlite:///{path}")
+        configure_sqlite(engine, read_only=True)
+
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+            assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+            with pytest.raises(OperationalError):
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+
+        engine.dispose()
+
+
+@pytest.mark.unit
+class TestCreateDBEngine:
+    """dialect별 엔진 생성 테스트"""
+
+    @patch("app.db.connection.create_engine")
+    def test_postgres_pool_and_timeouts(self, mock_create_engine):
+        """PostgreSQL은 커넥션 풀과 statement timeout 설정"""
+        create_db_engine("postgresql://user:pw@db/timjs", read_only=True)
+
+        kwargs = mock_create_engine.call_args.kwargs
+        assert kwargs["pool_size"] == 10
+        assert kwargs["max_overflow"] == 20
+        assert kwargs["pool_pre_ping"] is True
+        assert kwargs["connect_args"]["options"] == (
+            "-c statement_timeout=30000 -c default_transaction_read_only=on"
+        )
+
+    def test_sqlite_keeps_thread_check_disabled(self):
+        """SQLite는 스레드 검사 없이 pragma만 적용"""
+        engine = create_db_engine("sqlite://")
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2
+        engine.dispose()
@@ -0,0 +1,182 @@
+"""
+스키마 마이그레이션 테스트
+"""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.migrations import run_migrations
+from app.db.models import Base
+
+
+@pytest.mark.db
+class TestMigrations:
+    """run_migrations 테스트"""
+
+    def test_creates_missing_indexes(self, test_engine):
+        """기존 DB에 없는 인덱스 생성"""
+        with test_engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_media_event_id_created_at_id"))
+            conn.execute(text("DROP INDEX ix_events_team_id_date_id"))
+
+        run_migrations(test_engine)
+
+        inspector = inspect(test_engine)
+        media_indexes = {ix["name"] for ix in inspector.get_indexes("media")}
+        event_indexes = {ix["name"] for ix in inspector.get_indexes("events")}
+        assert "ix_media_event_id_created_at_id" in media_indexes
+        assert "ix_events_team_id_date_id" in event_indexes
+
+    def test_object_key_indexes_made_unique(self, test_engine):
+        """기존의 일반 object key 인덱스를 unique로 다시 생성"""
+        with test_engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_media_s3_key"))
+            conn.execute(text("CREATE INDEX ix_media_s3_key ON media (s3_key)"))
+
+        run_migrations(test_engine)
+
+        indexes = {
+            ix["name"]: ix["unique"] for ix in inspect(test_engine).get_indexes("media")
+        }
+        assert indexes["ix_media_s3_key"]
+        assert indexes["ix_media_thumb_s3_key"]
+
+    def test_clears_shared_object_keys(self, test_engine):
+        """여러 행이 공유하는 object key는 비워서 unique 인덱스를 만듦"""
+        with test_engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_media_s3_key"))
+            conn.execute(text("DROP INDEX ix_media_thumb_s3_key"))
+            conn.execute(
+                text(
+                    "INSERT INTO media (event_id, user_id, team_id, url, thumb_url, "
+                    "s3_key, thumb_s3_key, file_type, created_at) VALUES "
+                    "(1, 1, 1, 'u', 't', 'a.jpg', 'shared.jpg', 'image/jpeg', "
+                    "'2025-10-22'), "
+                    "(1, 1, 1, 'u', 't', 'b.jpg', 'shared.jpg', 'image/jpeg', "
+                    "'2025-10-22')"
+                )
+            )
+
+        run_migrations(test_engine)
+
+        with test_engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT s3_key, thumb_s3_key FROM media ORDER BY id")
+            ).all()
+        assert [tuple(row) for row in rows] == [("a.jpg", None), ("b.jpg", None)]
+
+    def test_clears_invalid_file_metadata(self, test_engine):
+        """JSON으로 파싱할 수 없는 file_metadata 정리"""
+        with test_engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO media (event_id, user_id, team_id, url, thumb_url, "
+                    "file_type, file_metadata, created_at) VALUES "
+                    "(1, 1, 1, 'u', 't', 'image/jpeg', '{\"width\": 1}', "
+                    "'2025-10-22'), "
+                    "(1, 1, 1, 'u', 't', 'image/jpeg', 'not json', '2025-10-22'), "
+                    "(1, 1, 1, 'u', 't', 'image/jpeg', 'null', '2025-10-22')"
+                )
+            )
+
+        run_migrations(test_engine)
+
+        with test_engine.connect() as conn:
+            values = conn.execute(
+                text("SELECT file_metadata FROM media ORDER BY id")
+            ).scalars()
+            assert list(values) == ['{"width": 1}', None, None]
+
+    def test_idempotent(self, test_engine):
+        """여러 번 실행해도 안전"""
+        run_migrations(test_engine)
+        run_migrations(test_engine)
+
+    def test_legacy_tags_moved_once(self):
+        """태그 이전을 반복 실행해도 중복되지 않고, 긴 태그는 컬럼 길이에 맞춤"""
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE events ADD COLUMN tags TEXT"))
+            conn.execute(
+                text(
+                    "INSERT INTO events (id, title, date, team_id, tags, thumbnails) "
+                    "VALUES (1, 'event', '2025-10-22', 1, 'a,b', '[]'), "
+                    f"(2, 'long', '2025-10-22', 1, '{'x' * 150}', '[]')"
+                )
+            )
+
+        run_migrations(engine)
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            count = conn.execute(text("SELECT count(*) FROM event_tags")).scalar()
+            longest = conn.execute(
+                text("SELECT max(length(tag)) FROM event_tags")
+            ).scalar()
+        assert count == 3
+        assert longest == 100
+        engine.dispose()
+
+    def test_backfills_legacy_schema(self):
+        """이전 스키마의 events/media 테이블에 컬럼 추가 및 값 채우기"""
+        engine = create_engine("sqlite:///:memory:")
+        tables = [Base.metadata.tables[name] for name in ("teams", "users")]
+        Base.metadata.create_all(bind=engine, tables=tables)
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE events (id INTEGER PRIMARY KEY, s3_key VARCHAR(21), "
+                    "title VARCHAR(200), description TEXT, date DATETIME, "
+                    "location VARCHAR(255), tags TEXT, team_id INTEGER)"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE TABLE media (id INTEGER PRIMARY KEY, event_id INTEGER, "
+                    "user_id INTEGER, url TEXT, thumb_url TEXT, file_type TEXT, "
+                    "file_size INTEGER, file_metadata TEXT, created_at DATETIME)"
+                )
+            )
+            conn.execute(text("INSERT INTO teams (id, name) VALUES (7, 'team')"))
+            conn.execute(
+                text(
+                    "INSERT INTO events (id, title, date, tags, team_id) VALUES "
+                    "(1, 'event', '2025-10-22 10:00:00', 'a,b', 7), "
+                    "(2, 'empty', '2025-10-23 10:00:00', NULL, 7)"
+                )
+            )
+            for i in range(5):
+                conn.execute(
+                    text(
+                        "INSERT INTO media (event_id, user_id, url, thumb_url, "
+                        "file_type, created_at) VALUES (1, 1, :url, :thumb, "
+                        "'image/jpeg', :created_at)"
+                    ),
+                    {
+                        "url": f"https://bucket.s3.amazonaws.com/media/e/{i}.jpg",
+                        "thumb": f"t{i}",
+                        "created_at": f"2025-10-22 10:00:0{i}",
+                    },
+                )
+
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            team_ids = conn.execute(text("SELECT team_id FROM media")).scalars().all()
+            keys = conn.execute(
+                text("SELECT s3_key, thumb_s3_key FROM media ORDER BY id")
+            ).all()
+            tags = conn.execute(
+                text("SELECT event_id, tag FROM event_tags ORDER BY id")
+            ).all()
+            previews = conn.execute(
+                text("SELECT id, media_count, thumbnails FROM events ORDER BY id")
+            ).all()
+        assert team_ids == [7] * 5
+        assert keys[0] == ("media/e/0.jpg", "t0")
+        assert tags == [(1, "a"), (1, "b")]
+        assert previews == [(1, 5, '["t4", "t3", "t2"]'), (2, 0, "[]")]
+        indexes = {ix["name"] for ix in inspect(engine).get_indexes("media")}
+        assert "ix_media_team_id_created_at_id" in indexes
+        engine.dispose()
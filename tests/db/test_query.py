@@ -2,12 +2,64 @@
 데이터베이스 쿼리 함수 테스트
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import sessionmaker
 
 from app.db import query
-from app.db.models import Event, Media, User
+from app.db.models import (
+    Base,
+    Event,
+    EventTag,
+    Media,
+    StorageReservation,
+    Team,
+    User,
+)
+from app.utils.cache import roster_cache
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """
+    File-backed DB for tests that need several sessions on separate connections
+    Yields (session_maker, team_id, event_id, media_ids) with two 1 KB media
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_maker = sessionmaker(bind=engine, autoflush=False)
+
+    with session_maker() as db:
+        team = Team(name="Team", storage_limit=1048576, storage_used=2)
+        db.add(team)
+        db.flush()
+        user = User(name="User", api_key="key", team_id=team.id)
+        event = Event(title="Event", date=datetime(2025, 10, 22), team_id=team.id)
+        db.add_all([user, event])
+        db.flush()
+        media_list = [
+            Media(
+                event_id=event.id,
+                user_id=user.id,
+                team_id=team.id,
+                url=f"https://test.s3.amazonaws.com/{i}.jpg",
+                thumb_url=f"https://test.s3.amazonaws.com/{i}_thumb.jpg",
+                file_type="image/jpeg",
+                file_size=1024,
+                created_at=datetime(2025, 10, 22, 10, i),
+            )
+            for i in range(2)
+        ]
+        db.add_all(media_list)
+        event.media_count = 2
+        db.commit()
+        ids = (team.id, event.id, [media.id for media in media_list])
+
+    yield session_maker, *ids
+    engine.dispose()
 
 
 @pytest.mark.db
@@ -16,7 +68,7 @@ class TestEventQueries:
 
     def test_list_events(self, test_db, sample_team, sample_event):
         """이벤트 목록 조회"""
-        events = query.list_events(test_db, sample_team.id)
+        events, _, _ = query.list_events(test_db, sample_team.id)
         assert len(events) == 1
         assert events[0].title == "Test Event"
 
@@ -25,23 +77,115 @@ class TestEventQueries:
     ):
         """썸네일 포함 이벤트 목록 조회"""
         # 미디어 추가
-        for i in range(5):
-            media = Media(
-                event_id=sample_event.id,
-                user_id=sample_user.id,
-                url=f"https://test.s3.amazonaws.com/test{i}.jpg",
-                thumb_url=f"https://test.s3.amazonaws.com/test{i}_thumb.jpg",
-                file_type="image/jpeg",
-                file_size=1024,
-                created_at=datetime.now(),
-            )
-            test_db.add(media)
-        test_db.commit()
+        query.create_media_bulk(
+            db=test_db,
+            user_id=sample_user.id,
+            media_data_list=[
+                {
+                    "event_id": sample_event.id,
+                    "url": f"https://test.s3.amazonaws.com/test{i}.jpg",
+                    "thumb_url": f"https://test.s3.amazonaws.com/test{i}_thumb.jpg",
+                    "file_type": "image/jpeg",
+                    "file_size": 1024,
+                    "created_at": datetime.now(),
+                }
+                for i in range(5)
+            ],
+            team_id=sample_team.id,
+        )
 
-        events = query.list_events(test_db, sample_team.id)
+        events, _, _ = query.list_events(test_db, sample_team.id)
         assert len(events) == 1
         assert hasattr(events[0], "thumbnails")
         assert len(events[0].thumbnails) == 3  # 최대 3개
+        assert (
+            events[0].thumbnails[0] == "https://test.s3.amazonaws.com/test4_thumb.jpg"
+        )
+        assert events[0].media_count == 5
+
+    def test_delete_media_updates_preview(
+        self, test_db, sample_team, sample_event, sample_media
+    ):
+        """미디어 삭제 시 이벤트 미리보기 갱신"""
+        query.refresh_event_preview(test_db, sample_event.id)
+        test_db.refresh(sample_event)
+        assert sample_event.thumbnails == [sample_media.thumb_url]
+        assert sample_event.media_count == 1
+
+        query.delete_media(test_db, sample_media, sample_team.id)
+
+        test_db.refresh(sample_event)
+        assert sample_event.thumbnails == []
+        assert sample_event.media_count == 0
+
+    def test_list_events_pagination(self, test_db, sample_team):
+        """이벤트 목록 커서 페이지네이션 (같은 날짜 포함)"""
+        for i in range(5):
+            test_db.add(
+                Event(
+                    title=f"Event {i}",
+                    date=datetime(2025, 10, 20 + i // 2),
+                    team_id=sample_team.id,
+                )
+            )
+        test_db.commit()
+
+        titles = []
+        cursor = None
+        while True:
+            events, cursor, has_more = query.list_events(
+                test_db, sample_team.id, limit=2, cursor=cursor
+            )
+            titles += [e.title for e in events]
+            if not has_more:
+                break
+
+        assert titles == ["Event 4", "Event 3", "Event 2", "Event 1", "Event 0"]
+        assert cursor is None
+
+    def test_list_events_date_range(self, test_db, sample_team):
+        """이벤트 목록 날짜 범위 필터"""
+        for day in (1, 10, 20):
+            test_db.add(
+                Event(
+                    title=f"Day {day}",
+                    date=datetime(2025, 10, day),
+                    team_id=sample_team.id,
+                )
+            )
+        test_db.commit()
+
+        events, _, _ = query.list_events(
+            test_db,
+            sample_team.id,
+            date_from=datetime(2025, 10, 10),
+            date_to=datetime(2025, 10, 20),
+        )
+        assert [e.title for e in events] == ["Day 20", "Day 10"]
+
+    def test_list_events_by_tag(self, test_db, sample_team, sample_event):
+        """태그로 이벤트 필터링"""
+        query.create_event(
+            db=test_db,
+            title="Other Event",
+            date=datetime(2025, 10, 25),
+            team_id=sample_team.id,
+            tags=["other"],
+        )
+
+        events, _, _ = query.list_events(test_db, sample_team.id, tag="event")
+        assert [e.title for e in events] == ["Test Event"]
+
+        events, _, _ = query.list_events(test_db, sample_team.id, tag="missing")
+        assert events == []
+
+    def test_update_event_tags(self, test_db, sample_event):
+        """이벤트 태그 교체"""
+        query.update_event(db=test_db, event=sample_event, tags=["a", "b", "a"])
+
+        test_db.refresh(sample_event)
+        assert sample_event.tags == ["a", "b"]
+        assert test_db.query(EventTag).count() == 2
 
     def test_get_event_success(self, test_db, sample_team, sample_event):
         """이벤트 ID로 조회 성공"""
@@ -71,10 +215,10 @@ class TestEventQueries:
             tags=["new", "test"],
         )
 
-        events = query.list_events(test_db, sample_team.id)
+        events, _, _ = query.list_events(test_db, sample_team.id)
         assert len(events) == 1
         assert events[0].title == "New Event"
-        assert events[0].tags == "new,test"
+        assert events[0].tags == ["new", "test"]
 
     def test_update_event(self, test_db, sample_event):
         """이벤트 수정"""
@@ -161,6 +305,233 @@ class TestMediaQueries:
         expected_increase = 6  # ceil(6144 / 1024)
         assert sample_team.storage_used == initial_storage + expected_increase
 
+    def test_create_media_bulk_skips_other_team_preview(
+        self, test_db, sample_user, sample_team
+    ):
+        """다른 팀 이벤트의 미리보기는 갱신하지 않음"""
+        other_team = Team(name="Other Team", storage_limit=1048576, storage_used=0)
+        test_db.add(other_team)
+        test_db.flush()
+        other_event = Event(
+            title="Other", date=datetime(2025, 10, 22), team_id=other_team.id
+        )
+        test_db.add(other_event)
+        test_db.commit()
+
+        query.create_media_bulk(
+            db=test_db,
+            user_id=sample_user.id,
+            media_data_list=[
+                {
+                    "event_id": other_event.id,
+                    "url": "https://test.s3.amazonaws.com/test.jpg",
+                    "thumb_url": "https://test.s3.amazonaws.com/test_thumb.jpg",
+                    "file_type": "image/jpeg",
+                    "file_size": 1024,
+                    "created_at": datetime.now(),
+                }
+            ],
+            team_id=sample_team.id,
+        )
+
+        test_db.refresh(other_event)
+        assert other_event.media_count == 0
+        assert other_event.thumbnails == []
+
+    def test_file_metadata_json(self, test_db, sample_event, sample_user, sample_team):
+        """file_metadata JSON 저장 및 필드 조회"""
+        query.create_media_bulk(
+            db=test_db,
+            user_id=sample_user.id,
+            media_data_list=[
+                {
+                    "event_id": sample_event.id,
+                    "url": f"https://test.s3.amazonaws.com/test{width}.jpg",
+                    "thumb_url": f"https://test.s3.amazonaws.com/test{width}_thumb.jpg",
+                    "file_type": "image/jpeg",
+                    "file_size": 1024,
+                    "file_metadata": {"width": width} if width else None,
+                    "created_at": datetime.now(),
+                }
+                for width in (1920, 1080, None)
+            ],
+            team_id=sample_team.id,
+        )
+
+        media = (
+            test_db.query(Media)
+            .filter(Media.file_metadata["width"].as_integer() == 1920)
+            .one()
+        )
+        assert media.file_metadata == {"width": 1920}
+
+        # 메타데이터가 없으면 JSON 'null'이 아닌 SQL NULL로 저장
+        assert test_db.query(Media).filter(Media.file_metadata.is_(None)).count() == 1
+
+    def test_create_media_bulk_duplicate_keys(self):
+        """이미 다른 미디어가 쓰는 S3 키로는 생성하지 않고 사용량도 그대로"""
+        # Own engine, since the failed commit rolls back the whole session
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        team = Team(name="Team", storage_limit=1048576, storage_used=0)
+        db.add(team)
+        db.flush()
+        user = User(name="User", api_key="key", team_id=team.id)
+        event = Event(title="Event", date=datetime(2025, 10, 22), team_id=team.id)
+        db.add_all([user, event])
+        db.commit()
+
+        media_data = {
+            "event_id": event.id,
+            "url": "https://test.s3.amazonaws.com/dup.jpg",
+            "thumb_url": "https://test.s3.amazonaws.com/dup_thumb.jpg",
+            "s3_key": "dup.jpg",
+            "thumb_s3_key": "dup_thumb.jpg",
+            "file_type": "image/jpeg",
+            "file_size": 1024,
+            "created_at": datetime.now(),
+        }
+        query.create_media_bulk(db, user.id, [media_data], team.id)
+        with pytest.raises(query.MediaAlreadyExistsError):
+            query.create_media_bulk(db, user.id, [media_data], team.id)
+
+        assert db.query(Media).count() == 1
+        assert db.get(Team, team.id).storage_used == 1
+        db.close()
+        engine.dispose()
+
+    def test_create_media_bulk_storage_limit(
+        self, test_db, sample_event, sample_user, sample_team
+    ):
+        """스토리지 한도 초과 시 아무것도 저장하지 않음"""
+        sample_team.storage_used = sample_team.storage_limit - 1
+        test_db.commit()
+
+        with pytest.raises(query.StorageLimitExceededError):
+            query.create_media_bulk(
+                db=test_db,
+                user_id=sample_user.id,
+                media_data_list=[
+                    {
+                        "event_id": sample_event.id,
+                        "url": "https://test.s3.amazonaws.com/test.jpg",
+                        "thumb_url": "https://test.s3.amazonaws.com/test_thumb.jpg",
+                        "file_type": "image/jpeg",
+                        "file_size": 2048,
+                        "created_at": datetime.now(),
+                    }
+                ],
+                team_id=sample_team.id,
+            )
+
+        assert test_db.query(Media).count() == 0
+        test_db.refresh(sample_team)
+        assert sample_team.storage_used == sample_team.storage_limit - 1
+
+    def test_reserve_storage_limit(self, test_db, sample_team):
+        """예약된 용량까지 포함해 한도를 넘으면 예약 실패"""
+        sample_team.storage_used = sample_team.storage_limit - 10
+        test_db.commit()
+        expires_at = datetime.now() + timedelta(hours=1)
+
+        query.reserve_storage(test_db, sample_team.id, {"a.jpg": 6 * 1024}, expires_at)
+        with pytest.raises(query.StorageLimitExceededError):
+            query.reserve_storage(
+                test_db, sample_team.id, {"b.jpg": 6 * 1024}, expires_at
+            )
+
+        assert test_db.query(StorageReservation).count() == 1
+
+    def test_reserve_storage_locks_team_first(self, test_db, sample_team):
+        """예약 합계는 팀 행을 잠근 뒤에 읽어야 동시 예약을 놓치지 않음"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement.split()[0])
+
+        engine = test_db.get_bind()
+        sa_event.listen(engine, "before_cursor_execute", record)
+        try:
+            query.reserve_storage(
+                test_db,
+                sample_team.id,
+                {"a.jpg": 1024},
+                datetime.now() + timedelta(hours=1),
+            )
+        finally:
+            sa_event.remove(engine, "before_cursor_execute", record)
+
+        assert statements[:2] == ["UPDATE", "SELECT"]
+
+    def test_reserve_storage_ignores_expired(self, test_db, sample_team):
+        """만료된 예약은 한도 계산에서 제외하고 정리함"""
+        sample_team.storage_used = sample_team.storage_limit - 10
+        test_db.add(
+            StorageReservation(
+                key="old.jpg",
+                team_id=sample_team.id,
+                size_kb=10,
+                expires_at=datetime.now() - timedelta(minutes=1),
+            )
+        )
+        test_db.commit()
+
+        query.reserve_storage(
+            test_db,
+            sample_team.id,
+            {"new.jpg": 10 * 1024},
+            datetime.now() + timedelta(hours=1),
+        )
+
+        keys = [r.key for r in test_db.query(StorageReservation).all()]
+        assert keys == ["new.jpg"]
+
+    def test_create_media_bulk_releases_reservation(
+        self, test_db, sample_event, sample_user, sample_team
+    ):
+        """업로드 확정 시 해당 키의 예약을 사용량으로 전환"""
+        sample_team.storage_used = sample_team.storage_limit - 2
+        test_db.commit()
+        query.reserve_storage(
+            test_db,
+            sample_team.id,
+            {"original/test.jpg": 2048},
+            datetime.now() + timedelta(hours=1),
+        )
+
+        query.create_media_bulk(
+            db=test_db,
+            user_id=sample_user.id,
+            media_data_list=[
+                {
+                    "event_id": sample_event.id,
+                    "url": "https://test.s3.amazonaws.com/original/test.jpg",
+                    "thumb_url": "https://test.s3.amazonaws.com/thumb/test.jpg",
+                    "file_type": "image/jpeg",
+                    "file_size": 2048,
+                    "created_at": datetime.now(),
+                }
+            ],
+            team_id=sample_team.id,
+            reserved_keys=["original/test.jpg"],
+        )
+
+        assert test_db.query(StorageReservation).count() == 0
+        test_db.refresh(sample_team)
+        assert sample_team.storage_used == sample_team.storage_limit
+
+    def test_delete_media_clamps_storage(self, test_db, sample_media, sample_team):
+        """삭제 시 스토리지 사용량이 0 미만으로 내려가지 않음"""
+        sample_team.storage_used = 0
+        test_db.commit()
+
+        query.delete_media(test_db, sample_media, sample_team.id)
+
+        test_db.refresh(sample_team)
+        assert sample_team.storage_used == 0
+
     def test_delete_media(self, test_db, sample_media, sample_team):
         """미디어 삭제 및 스토리지 감소 확인"""
         initial_storage = sample_team.storage_used
@@ -176,6 +547,45 @@ class TestMediaQueries:
         expected_decrease = 1  # ceil(1024 / 1024)
         assert sample_team.storage_used == initial_storage - expected_decrease
 
+    def test_delete_media_concurrent(self, file_db):
+        """두 세션이 같은 미디어를 지워도 사용량과 개수는 한 번만 감소"""
+        session_maker, team_id, event_id, media_ids = file_db
+
+        # Both requests loaded the media before either deleted it
+        first, second = session_maker(), session_maker()
+        first_media = first.get(Media, media_ids[0])
+        second_media = second.get(Media, media_ids[0])
+
+        query.delete_media(first, first_media, team_id)
+        with pytest.raises(query.MediaNotFoundError):
+            query.delete_media(second, second_media, team_id)
+        first.close()
+        second.close()
+
+        with session_maker() as db:
+            assert db.get(Team, team_id).storage_used == 1
+            assert db.get(Event, event_id).media_count == 1
+            assert db.query(Media).count() == 1
+
+    def test_delete_media_bulk_overlapping(self, file_db):
+        """겹치는 일괄 삭제는 이미 지워진 미디어가 있으면 아무것도 지우지 않음"""
+        session_maker, team_id, event_id, media_ids = file_db
+
+        # The bulk request loaded both before a single delete removed one
+        single, bulk = session_maker(), session_maker()
+        media_list = bulk.query(Media).filter(Media.id.in_(media_ids)).all()
+
+        query.delete_media(single, single.get(Media, media_ids[0]), team_id)
+        with pytest.raises(query.MediaNotFoundError):
+            query.delete_media_bulk(bulk, media_list, team_id)
+        single.close()
+        bulk.close()
+
+        with session_maker() as db:
+            assert db.get(Media, media_ids[1]) is not None
+            assert db.get(Team, team_id).storage_used == 1
+            assert db.get(Event, event_id).media_count == 1
+
     def test_get_media_feed(self, test_db, sample_event, sample_user, sample_team):
         """미디어 피드 조회"""
         # 여러 미디어 생성
@@ -183,6 +593,7 @@ class TestMediaQueries:
             media = Media(
                 event_id=sample_event.id,
                 user_id=sample_user.id,
+                team_id=sample_event.team_id,
                 url=f"https://test.s3.amazonaws.com/test{i}.jpg",
                 thumb_url=f"https://test.s3.amazonaws.com/test{i}_thumb.jpg",
                 file_type="image/jpeg",
@@ -208,6 +619,7 @@ class TestMediaQueries:
             media = Media(
                 event_id=sample_event.id,
                 user_id=sample_user.id,
+                team_id=sample_event.team_id,
                 url=f"https://test.s3.amazonaws.com/test{i}.jpg",
                 thumb_url=f"https://test.s3.amazonaws.com/test{i}_thumb.jpg",
                 file_type="image/jpeg",
@@ -231,6 +643,39 @@ class TestMediaQueries:
         assert len(media_list_2) == 5
         assert has_more_2 is False
 
+    def test_get_media_feed_with_legacy_cursor(
+        self, test_db, sample_event, sample_user, sample_team
+    ):
+        """기존 정수(미디어 ID) 커서 호환"""
+        for i in range(10):
+            media = Media(
+                event_id=sample_event.id,
+                user_id=sample_user.id,
+                team_id=sample_event.team_id,
+                url=f"https://test.s3.amazonaws.com/test{i}.jpg",
+                thumb_url=f"https://test.s3.amazonaws.com/test{i}_thumb.jpg",
+                file_type="image/jpeg",
+                file_size=1024,
+                created_at=datetime.now(),
+            )
+            test_db.add(media)
+        test_db.commit()
+
+        media_list_1, _, _ = query.get_media_feed(
+            test_db, limit=5, team_id=sample_team.id
+        )
+        media_list_2, _, has_more_2 = query.get_media_feed(
+            test_db, limit=5, cursor=str(media_list_1[-1].id), team_id=sample_team.id
+        )
+        assert len(media_list_2) == 5
+        assert has_more_2 is False
+        assert not {m.id for m in media_list_1} & {m.id for m in media_list_2}
+
+    def test_get_media_feed_invalid_cursor(self, test_db, sample_team):
+        """잘못된 커서"""
+        with pytest.raises(ValueError):
+            query.get_media_feed(test_db, cursor="not-a-cursor", team_id=sample_team.id)
+
 
 @pytest.mark.db
 class TestUserQueries:
@@ -288,6 +733,76 @@ class TestUserQueries:
         test_db.refresh(sample_user)
         assert sample_user.profile_img == new_img
 
+    def test_clear_push_tokens(self, test_db, sample_team, sample_user):
+        """등록 해제된 푸시 토큰 일괄 삭제"""
+        other = User(
+            name="Other",
+            api_key="other_key",
+            expo_push_token="ExponentPushToken[other]",
+            team_id=sample_team.id,
+        )
+        test_db.add(other)
+        test_db.commit()
+
+        query.clear_push_tokens(test_db, [sample_user.expo_push_token])
+
+        test_db.refresh(sample_user)
+        test_db.refresh(other)
+        assert sample_user.expo_push_token is None
+        assert other.expo_push_token == "ExponentPushToken[other]"
+
+    def test_get_team_roster_cached(self, test_db, sample_team, sample_user):
+        """팀 명단은 캐시되고 사용자 정보 변경 시 무효화됨"""
+        roster_cache.clear()
+        roster = query.get_team_roster(test_db, sample_team.id)
+        assert [m.id for m in roster] == [sample_user.id]
+
+        # 캐시된 명단은 DB 변경을 바로 반영하지 않음
+        test_db.add(User(name="New", api_key="new_key", team_id=sample_team.id))
+        test_db.commit()
+        assert query.get_team_roster(test_db, sample_team.id) is roster
+
+        query.update_user(test_db, sample_user.id, profile_img="https://img/1.jpg")
+        roster = query.get_team_roster(test_db, sample_team.id)
+        assert len(roster) == 2
+        assert roster[0].profile_img == "https://img/1.jpg"
+        roster_cache.clear()
+
+    def test_get_team_roster_invalidated_during_fill(
+        self, test_db, sample_team, sample_user
+    ):
+        """명단을 읽는 사이 무효화되면 읽은 명단을 캐시하지 않음"""
+        roster_cache.clear()
+        team_id = sample_team.id
+
+        # update_user commits and invalidates while the fill's SELECT runs
+        def invalidate(*args):
+            roster_cache.delete(team_id)
+
+        engine = test_db.get_bind()
+        sa_event.listen(engine, "before_cursor_execute", invalidate)
+        try:
+            roster = query.get_team_roster(test_db, team_id)
+        finally:
+            sa_event.remove(engine, "before_cursor_execute", invalidate)
+
+        assert [m.id for m in roster] == [sample_user.id]
+        assert roster_cache.get(team_id) is None
+
+    def test_clear_push_tokens_invalidates_roster(
+        self, test_db, sample_team, sample_user
+    ):
+        """해제된 토큰이 캐시된 명단에서도 제거됨"""
+        roster_cache.clear()
+        token = sample_user.expo_push_token
+        assert query.get_team_roster(test_db, sample_team.id)[0].expo_push_token
+
+        query.clear_push_tokens(test_db, [token])
+
+        roster = query.get_team_roster(test_db, sample_team.id)
+        assert roster[0].expo_push_token is None
+        roster_cache.clear()
+
 
 @pytest.mark.db
 class TestTeamQueries:
@@ -300,6 +815,31 @@ class TestTeamQueries:
         assert team.name == "Test Team"
         assert team.storage_limit == 1048576
 
+    def test_get_team_with_users(self, test_db, sample_team, sample_user):
+        """팀과 소속 사용자를 한 번에 조회"""
+        test_db.expire_all()
+        team = query.get_team_with_users(test_db, sample_team.id)
+
+        assert "users" in team.__dict__  # 추가 쿼리 없이 로드됨
+        assert [u.id for u in team.users] == [sample_user.id]
+
+    def test_get_team_with_roster(self, test_db, sample_team, sample_user):
+        """명단이 캐시되어 있으면 팀만 조회하고, fill_cache일 때만 캐시를 채움"""
+        roster_cache.clear()
+        team, roster = query.get_team_with_roster(test_db, sample_team.id)
+        assert team.id == sample_team.id
+        assert [m.id for m in roster] == [sample_user.id]
+        assert roster_cache.get(sample_team.id) is None
+
+        team, roster = query.get_team_with_roster(
+            test_db, sample_team.id, fill_cache=True
+        )
+        assert roster_cache.get(sample_team.id) is roster
+
+        team, cached = query.get_team_with_roster(test_db, sample_team.id)
+        assert cached is roster
+        roster_cache.clear()
+
     def test_get_team_not_found(self, test_db):
         """존재하지 않는 팀 조회"""
         team = query.get_team(test_db, 99999)
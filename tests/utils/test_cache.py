@@ -0,0 +1,82 @@
+"""
+Cache 유틸리티 테스트
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.cache import TTLCache
+
+
+@pytest.mark.unit
+class TestTTLCache:
+    """TTLCache 테스트"""
+
+    def test_get_set(self):
+        """값 저장 및 조회"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+
+    def test_lru_eviction(self):
+        """최대 크기 초과 시 가장 오래 사용하지 않은 항목 제거"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_ttl_expiry(self):
+        """TTL 경과 후 만료"""
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch("app.utils.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with patch("app.utils.cache.time.monotonic", return_value=109):
+            assert cache.get("a") == 1
+        with patch("app.utils.cache.time.monotonic", return_value=110):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_hit_miss_counters(self):
+        """적중/실패 횟수 집계"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.get("a")
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+        assert cache.hits == 2
+        assert cache.misses == 1
+
+    def test_delete_and_clear(self):
+        """삭제 및 초기화"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.delete("a")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_set_skipped_after_invalidation(self):
+        """읽기 전 세대 이후 삭제나 초기화가 있었으면 저장하지 않음"""
+        cache = TTLCache(maxsize=2, ttl=60)
+
+        generation = cache.generation("a")
+        cache.delete("a")
+        cache.set("a", "stale", generation)
+        assert cache.get("a") is None
+
+        generation = cache.generation("a")
+        cache.clear()
+        cache.set("a", "stale", generation)
+        assert cache.get("a") is None
+
+        generation = cache.generation("a")
+        cache.delete("b")
+        cache.set("a", "fresh", generation)
+        assert cache.get("a") == "fresh"
@@ -0,0 +1,111 @@
+"""
+Push notification 유틸리티 테스트
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from exponent_server_sdk import PushMessage, PushServerError, PushTicket
+
+from app.utils.push_notification import PushDispatcher
+
+
+def _messages(count):
+    return [
+        PushMessage(to=f"ExponentPushToken[{i}]", title="title", body="body")
+        for i in range(count)
+    ]
+
+
+@pytest.mark.unit
+class TestPushDispatcher:
+    """PushDispatcher 테스트"""
+
+    def test_shutdown_drains_in_batches(self):
+        """종료 시 남은 메시지를 100개 단위 배치로 모두 전송"""
+        client = MagicMock()
+        dispatcher = PushDispatcher(client=client)
+
+        # 워커 시작 전에 큐에 쌓아 배치 크기를 결정적으로 만듦
+        with patch.object(dispatcher, "start"):
+            dispatcher.submit(_messages(250))
+        dispatcher.start()
+        dispatcher.shutdown()
+
+        batch_sizes = [len(c.args[0]) for c in client.publish_multiple.call_args_list]
+        assert batch_sizes == [100, 100, 50]
+
+    def test_submit_after_shutdown_restarts_worker(self):
+        """종료 후 다시 전송하면 새 워커가 처리"""
+        client = MagicMock()
+        client.publish_multiple.return_value = []
+        dispatcher = PushDispatcher(client=client)
+
+        dispatcher.submit(_messages(1))
+        dispatcher.shutdown()
+        dispatcher.submit(_messages(1))
+        dispatcher.shutdown()
+
+        assert client.publish_multiple.call_count == 2
+
+    @patch("app.utils.push_notification.time.sleep")
+    def test_retry_with_backoff(self, mock_sleep):
+        """서버 오류 시 지수 백오프로 재시도"""
+        client = MagicMock()
+        client.publish_multiple.side_effect = [
+            PushServerError("Request failed", MagicMock()),
+            PushServerError("Request failed", MagicMock()),
+            [],
+        ]
+        dispatcher = PushDispatcher(client=client)
+
+        dispatcher.submit(_messages(1))
+        dispatcher.shutdown()
+
+        assert client.publish_multiple.call_count == 3
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [1.0, 2.0]
+
+    @patch("app.utils.push_notification.time.sleep")
+    def test_give_up_after_max_retries(self, mock_sleep):
+        """최대 재시도 초과 시 포기"""
+        client = MagicMock()
+        client.publish_multiple.side_effect = PushServerError(
+            "Request failed", MagicMock()
+        )
+        dispatcher = PushDispatcher(client=client)
+
+        dispatcher.submit(_messages(1))
+        dispatcher.shutdown()
+
+        assert client.publish_multiple.call_count == 4
+
+    def test_unregistered_tokens_reported(self):
+        """DeviceNotRegistered 티켓의 토큰을 모아서 한 번에 전달"""
+        messages = _messages(3)
+        client = MagicMock()
+        client.publish_multiple.return_value = [
+            PushTicket(messages[0], PushTicket.SUCCESS_STATUS, "", None, "1"),
+            PushTicket(
+                messages[1],
+                PushTicket.ERROR_STATUS,
+                "not registered",
+                {"error": PushTicket.ERROR_DEVICE_NOT_REGISTERED},
+                "2",
+            ),
+            PushTicket(
+                messages[2],
+                PushTicket.ERROR_STATUS,
+                "too big",
+                {"error": PushTicket.ERROR_MESSAGE_TOO_BIG},
+                "3",
+            ),
+        ]
+        on_unregistered = MagicMock()
+        dispatcher = PushDispatcher(
+            client=client, on_device_not_registered=on_unregistered
+        )
+
+        dispatcher.submit(messages)
+        dispatcher.shutdown()
+
+        on_unregistered.assert_called_once_with(["ExponentPushToken[1]"])
@@ -0,0 +1,82 @@
+"""
+S3 유틸리티 테스트
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.utils.s3 import MediaType, S3Client, get_key_from_url, is_upload_key
+
+
+@pytest.mark.unit
+class TestS3Client:
+    """S3Client 테스트"""
+
+    @patch("app.utils.s3.boto3.client")
+    def test_client_created_lazily(self, mock_boto_client):
+        """boto3 클라이언트는 처음 사용할 때 한 번만 생성"""
+        client = S3Client()
+        mock_boto_client.assert_not_called()
+
+        assert client.s3_client is client.s3_client
+        mock_boto_client.assert_called_once()
+
+        config = mock_boto_client.call_args.kwargs["config"]
+        assert config.max_pool_connections >= 16
+        assert config.tcp_keepalive is True
+
+    def test_delete_files_in_batches(self):
+        """DeleteObjects 요청당 최대 1000개 키"""
+        client = S3Client()
+        client.s3_client = MagicMock()
+        client.s3_client.delete_objects.return_value = {}
+
+        assert client.delete_files([f"media/{i}.jpg" for i in range(2500)]) is True
+
+        batches = [
+            len(c.kwargs["Delete"]["Objects"])
+            for c in client.s3_client.delete_objects.call_args_list
+        ]
+        assert batches == [1000, 1000, 500]
+
+    def test_delete_files_reports_errors(self):
+        """일부 키 삭제 실패 시 False"""
+        client = S3Client()
+        client.s3_client = MagicMock()
+        client.s3_client.delete_objects.return_value = {
+            "Errors": [{"Key": "media/1.jpg", "Code": "AccessDenied"}]
+        }
+
+        assert client.delete_files(["media/1.jpg"]) is False
+
+    def test_is_upload_key(self):
+        """이벤트 폴더 바로 아래의 발급 형식 키만 허용"""
+        assert is_upload_key("media/evt/abc_-1.jpg", MediaType.ORIGINAL, "evt")
+        assert is_upload_key("media/thumb/evt/abc.jpg", MediaType.THUMBNAIL, "evt")
+        assert not is_upload_key("media/thumb/evt/abc.jpg", MediaType.ORIGINAL, "evt")
+        assert not is_upload_key("media/other/abc.jpg", MediaType.ORIGINAL, "evt")
+        assert not is_upload_key("media/evt/a/b.jpg", MediaType.ORIGINAL, "evt")
+        assert not is_upload_key("media/evt/abc.jpg#x", MediaType.ORIGINAL, "evt")
+
+    def test_presigned_key_drops_unsafe_extension(self):
+        """파일 이름의 확장자가 안전하지 않으면 키에 붙이지 않음"""
+        client = S3Client()
+        client.s3_client = MagicMock()
+        client.s3_client.generate_presigned_post.return_value = {
+            "url": "https://bucket",
+            "fields": {},
+        }
+
+        safe = client.generate_presigned_post("a.JPG", "image/jpeg", "evt")
+        unsafe = client.generate_presigned_post("a.jpg?x=1#y", "image/jpeg", "evt")
+
+        assert safe["key"].endswith(".JPG")
+        assert is_upload_key(safe["key"], MediaType.ORIGINAL, "evt")
+        assert "." not in unsafe["key"].rsplit("/", 1)[1]
+        assert is_upload_key(unsafe["key"], MediaType.ORIGINAL, "evt")
+
+    def test_get_key_from_url(self):
+        """공개 URL에서 객체 키 추출"""
+        url = "https://bucket.s3.ap-northeast-2.amazonaws.com/media/abc/1.jpg"
+        assert get_key_from_url(url) == "media/abc/1.jpg"
@@ -0,0 +1,45 @@
+"""
+응답 직렬화 유틸리티 테스트
+"""
+
+import pytest
+from fastapi import Response
+from pydantic import TypeAdapter, ValidationError
+
+from app.schemas import UserSummary
+from app.utils.config import get_settings
+from app.utils.serialization import build_model, serialize_response
+
+
+@pytest.mark.unit
+class TestSerialization:
+    """fast_serialization 설정에 따른 모델 생성 및 응답 테스트"""
+
+    def test_build_model_validates_by_default(self):
+        """기본 설정에서는 검증하여 모델 생성"""
+        with pytest.raises(ValidationError):
+            build_model(UserSummary, id="not-an-int", name="user")
+
+    def test_fast_serialization(self, monkeypatch):
+        """fast_serialization 설정 시 검증 없이 생성하고 바로 JSON 응답"""
+        monkeypatch.setattr(get_settings(), "fast_serialization", True)
+        user = build_model(UserSummary, id=1, name="user")
+
+        result = serialize_response(
+            Response(), user, TypeAdapter(UserSummary), {"ETag": "W/1"}
+        )
+
+        assert result.body == b'{"id":1,"name":"user"}'
+        assert result.headers["ETag"] == "W/1"
+
+    def test_response_model_path(self):
+        """기본 설정에서는 값을 그대로 반환하고 헤더만 설정"""
+        response = Response()
+        user = build_model(UserSummary, id=1, name="user")
+
+        result = serialize_response(
+            response, user, TypeAdapter(UserSummary), {"ETag": "W/1"}
+        )
+
+        assert result is user
+        assert response.headers["ETag"] == "W/1"